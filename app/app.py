@@ -3,9 +3,11 @@
 # dependencies = [
 #     "fastapi",
 #     "uvicorn",
-#     "httpx",
+#     "httpx[http2]",
 #     "python-dateutil",
 #     "pandas",
+#     "openpyxl",
+#     "pyarrow",
 #     "python-docx",
 #     "markdown2",
 #     "beautifulsoup4",
@@ -13,15 +15,31 @@
 #     "duckdb",
 #     "pillow",
 #     "vosk",
-#     "soundfile"
+#     "soundfile",
+#     "websockets"
 # ]
 # ///
 
-from fastapi import FastAPI, Response
+import asyncio
+from fastapi import FastAPI, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from agent import run_task
-from utils import read_file
-from helper import filter_csv_to_json_api
+from utils import read_file, close_http_client, aclose_http_client
+from plan_cache import plan_cache
+from router import router
+from registry import registry
+from images import derivative_cache
+from vision import ocr_cache
+from dates import date_cache
+from audio import (
+    model_pool,
+    preload_models,
+    StreamingTranscriber,
+    RecognizerBusy,
+    VOSK_MODEL_PATH,
+    STREAM_SAMPLE_RATES,
+)
 
 
 app = FastAPI()
@@ -41,6 +59,32 @@ DATA_DIR = "data"
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
 
+# Tool calls slower than this are logged with their time
+TOOL_SLOW_SECONDS = float(os.environ.get("TOOL_SLOW_SECONDS", "5"))
+
+
+def log_slow_tool(tool, elapsed, error):
+    if elapsed >= TOOL_SLOW_SECONDS:
+        status = "failed" if error is not None else "done"
+        print(f"Slow tool call: {tool.name} ({tool.kind}) {status} in {elapsed:.1f}s")
+
+
+registry.add_timing_hook(log_slow_tool)
+
+
+@app.on_event("startup")
+async def load_models():
+    # Models listed in VOSK_PRELOAD are loaded before the first request
+    await run_in_threadpool(preload_models)
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    close_http_client()
+    await aclose_http_client()
+    registry.shutdown()
+
+
 @app.post("/run")
 def run(task: str):
     if not task:
@@ -57,6 +101,109 @@ def run(task: str):
         return Response(content=str(e), status_code=500)
 
 
+# Streams that send nothing for this long are closed and free their recognizer
+STREAM_IDLE_SECONDS = float(os.environ.get("STREAM_IDLE_SECONDS", "30"))
+
+
+@app.websocket("/transcribe/stream")
+async def transcribe_stream(
+    websocket: WebSocket,
+    output_path: str,
+    sample_rate: int = 16000,
+):
+    """
+    Accepts raw mono 16-bit PCM chunks as binary messages and replies with
+    {"type": "partial" | "result", "text": ...} events as they are decoded.
+    A text message "EOF" (or disconnecting) ends the stream; the transcript
+    is then written to output_path and sent as a "final" event. The model
+    is always the server's VOSK_MODEL_PATH; clients cannot pick a path.
+    """
+    from helper import write_file
+
+    output_path = output_path.strip("/")
+    if not output_path.startswith("data"):
+        await websocket.close(code=1008, reason="Output file must be in the data directory.")
+        return
+    if sample_rate not in STREAM_SAMPLE_RATES:
+        await websocket.close(
+            code=1008,
+            reason=f"sample_rate must be one of {', '.join(map(str, STREAM_SAMPLE_RATES))}.",
+        )
+        return
+
+    await websocket.accept()
+    try:
+        # Loading a model or waiting for a free recognizer can block
+        transcriber = await run_in_threadpool(
+            StreamingTranscriber, VOSK_MODEL_PATH, sample_rate
+        )
+    except RecognizerBusy as e:
+        # 1013: try again later
+        await websocket.send_json({"type": "error", "text": str(e)})
+        await websocket.close(code=1013)
+        return
+    except Exception as e:
+        await websocket.send_json({"type": "error", "text": str(e)})
+        await websocket.close(code=1011)
+        return
+
+    connected = True
+    try:
+        while True:
+            message = await asyncio.wait_for(websocket.receive(), STREAM_IDLE_SECONDS)
+            if message["type"] == "websocket.disconnect":
+                connected = False
+                break
+            if message.get("text") == "EOF":
+                break
+            chunk = message.get("bytes")
+            if not chunk:
+                continue
+            event = await run_in_threadpool(transcriber.accept, chunk)
+            if event is not None:
+                await websocket.send_json(event)
+    except WebSocketDisconnect:
+        connected = False
+    except asyncio.TimeoutError:
+        transcriber.close(reusable=False)
+        await websocket.send_json(
+            {"type": "error", "text": f"No audio for {STREAM_IDLE_SECONDS:.0f}s"}
+        )
+        await websocket.close(code=1001)
+        return
+    except Exception as e:
+        transcriber.close(reusable=False)
+        if connected:
+            await websocket.send_json({"type": "error", "text": str(e)})
+            await websocket.close(code=1011)
+        return
+
+    try:
+        transcript = await run_in_threadpool(transcriber.finish)
+    except Exception as e:
+        if connected:
+            await websocket.send_json({"type": "error", "text": str(e)})
+            await websocket.close(code=1011)
+        return
+    finally:
+        # finish releases the recognizer itself; this only matters if it failed
+        transcriber.close(reusable=False)
+
+    try:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        write_file(output_path, transcript)
+    except ValueError as e:
+        if connected:
+            await websocket.send_json({"type": "error", "text": str(e)})
+            await websocket.close(code=1011)
+        return
+    if connected:
+        await websocket.send_json(
+            {"type": "final", "text": transcript, "output_path": output_path}
+        )
+        await websocket.close()
+
+
 @app.get("/read")
 def read(path: str):
     if not path:
@@ -72,6 +219,19 @@ def read(path: str):
         return Response(content=str(e), status_code=400)
 
 
+@app.get("/stats")
+def stats():
+    return {
+        "plan_cache": plan_cache.stats(),
+        "router": router.stats(),
+        "tools": registry.stats(),
+        "vosk": model_pool.stats(),
+        "image_cache": derivative_cache.stats(),
+        "ocr_cache": ocr_cache.stats(),
+        "date_cache": date_cache.stats(),
+    }
+
+
 @app.get("/filter_csv")
 def filter_csv(csv_path: str, filter_column: str, filter_value: str):
     if not csv_path or not filter_column or not filter_value:
@@ -80,6 +240,8 @@ def filter_csv(csv_path: str, filter_column: str, filter_value: str):
             status_code=400,
         )
 
+    from helper import filter_csv_to_json_api
+
     try:
         output_file = filter_csv_to_json_api(
             csv_path, filter_column, filter_value, "api_endpoint"
@@ -94,6 +256,8 @@ async def create_endpoint(api_endpoint: str, csv_path: str, filter_column: str,
     if f"/{api_endpoint}" in existing_routes:
         return Response(content=f"Endpoint '{api_endpoint}' already exists.", status_code=400)
 
+    from helper import filter_csv_to_json_api
+
     return filter_csv_to_json_api(app, csv_path, filter_column, filter_value, api_endpoint)
 
 
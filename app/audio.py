@@ -0,0 +1,510 @@
+import os
+import json
+import time
+import wave
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+VOSK_MODEL_PATH = os.environ.get("VOSK_MODEL_PATH", "model")
+# Comma separated model paths to load when the app starts
+VOSK_PRELOAD = os.environ.get("VOSK_PRELOAD", "")
+VOSK_POOL_SIZE = int(os.environ.get("VOSK_POOL_SIZE", "4"))
+# How long a stream waits for a free recognizer before it is turned away
+VOSK_ACQUIRE_TIMEOUT = float(os.environ.get("VOSK_ACQUIRE_TIMEOUT", "5"))
+# Rates a client may stream at; each one gets its own recognizer pool
+STREAM_SAMPLE_RATES = (8000, 16000, 22050, 32000, 44100, 48000)
+
+# Segmented transcription of long recordings
+AUDIO_WORKERS = int(os.environ.get("AUDIO_WORKERS", str(os.cpu_count() or 1)))
+AUDIO_SEGMENT_SECONDS = float(os.environ.get("AUDIO_SEGMENT_SECONDS", "60"))
+AUDIO_SEGMENT_OVERLAP = float(os.environ.get("AUDIO_SEGMENT_OVERLAP", "1.0"))
+AUDIO_SILENCE_SEARCH = float(os.environ.get("AUDIO_SILENCE_SEARCH", "5.0"))
+# Recordings at least this long are transcribed in parallel by default
+AUDIO_PARALLEL_MIN_SECONDS = float(os.environ.get("AUDIO_PARALLEL_MIN_SECONDS", "300"))
+ENERGY_FRAME_SECONDS = 0.02
+
+# Audio that is not mono 16-bit PCM is converted to this rate in-process
+VOSK_SAMPLE_RATE = int(os.environ.get("VOSK_SAMPLE_RATE", "16000"))
+AUDIO_BLOCK_FRAMES = int(os.environ.get("AUDIO_BLOCK_FRAMES", "16384"))
+# Anti-aliasing filter: cutoff as a fraction of the new Nyquist rate, and
+# filter half-length in zero crossings of the sinc
+RESAMPLE_CUTOFF = 0.45
+RESAMPLE_ZERO_CROSSINGS = 16
+
+
+class RecognizerBusy(Exception):
+    pass
+
+
+class RecognizerPool:
+    """Bounded pool of KaldiRecognizers sharing one model and sample rate."""
+
+    def __init__(self, model, sample_rate, size):
+        self.model = model
+        self.sample_rate = sample_rate
+        self.size = size
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.idle = []
+        self.created = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.acquisitions = 0
+        self.waits = 0
+
+    def acquire(self, timeout=None):
+        """A recognizer, waiting up to timeout seconds (forever if None) for one."""
+        from vosk import KaldiRecognizer  # type: ignore
+
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.waits += 1
+            if not self.slots.acquire(timeout=timeout):
+                raise RecognizerBusy(f"No free recognizer after {timeout:.0f}s")
+
+        with self.lock:
+            self.acquisitions += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            if self.idle:
+                return self.idle.pop()
+            self.created += 1
+        return KaldiRecognizer(self.model, self.sample_rate)
+
+    def release(self, recognizer, reusable=True):
+        with self.lock:
+            self.in_use -= 1
+            if reusable:
+                recognizer.Reset()
+                self.idle.append(recognizer)
+        self.slots.release()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "sample_rate": self.sample_rate,
+                "size": self.size,
+                "created": self.created,
+                "idle": len(self.idle),
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "utilisation": self.in_use / self.size,
+                "acquisitions": self.acquisitions,
+                "waits": self.waits,
+            }
+
+
+class ModelPool:
+    """Process-wide cache of loaded Vosk models and their recognizer pools."""
+
+    def __init__(self, pool_size=VOSK_POOL_SIZE):
+        self.pool_size = pool_size
+        self.lock = threading.Lock()
+        self.models = {}
+        self.load_seconds = {}
+        self.loading = {}
+        self.recognizer_pools = {}
+
+    def get_model(self, model_path=VOSK_MODEL_PATH):
+        model = self.models.get(model_path)
+        if model is not None:
+            return model
+
+        # One lock per path so loading one model does not block another
+        with self.lock:
+            path_lock = self.loading.setdefault(model_path, threading.Lock())
+        with path_lock:
+            model = self.models.get(model_path)
+            if model is not None:
+                return model
+
+            if not os.path.exists(model_path):
+                raise FileNotFoundError(
+                    f"Vosk model not found at '{model_path}'. Download from: https://alphacephei.com/vosk/models"
+                )
+            from vosk import Model  # type: ignore
+
+            start = time.perf_counter()
+            model = Model(model_path)
+            elapsed = time.perf_counter() - start
+            print(f"Loaded Vosk model '{model_path}' in {elapsed:.2f}s")
+            with self.lock:
+                self.models[model_path] = model
+                self.load_seconds[model_path] = elapsed
+            return model
+
+    def recognizer_pool(self, model_path, sample_rate):
+        key = (model_path, int(sample_rate))
+        with self.lock:
+            pool = self.recognizer_pools.get(key)
+        if pool is None:
+            model = self.get_model(model_path)
+            with self.lock:
+                pool = self.recognizer_pools.setdefault(
+                    key, RecognizerPool(model, int(sample_rate), self.pool_size)
+                )
+        return pool
+
+    @contextmanager
+    def recognizer(self, model_path, sample_rate):
+        """Borrows a recognizer for model_path at sample_rate from the pool."""
+        pool = self.recognizer_pool(model_path, sample_rate)
+        recognizer = pool.acquire()
+        reusable = False
+        try:
+            yield recognizer
+            reusable = True
+        finally:
+            # A recognizer that raised mid-stream is dropped rather than reused
+            pool.release(recognizer, reusable)
+
+    def preload(self, model_paths):
+        for model_path in model_paths:
+            self.get_model(model_path)
+
+    def stats(self):
+        with self.lock:
+            pools = list(self.recognizer_pools.items())
+            load_seconds = dict(self.load_seconds)
+        return {
+            "models": {
+                model_path: {"load_seconds": seconds}
+                for model_path, seconds in load_seconds.items()
+            },
+            "recognizer_pools": {
+                f"{model_path}@{sample_rate}": pool.stats()
+                for (model_path, sample_rate), pool in pools
+            },
+        }
+
+
+model_pool = ModelPool()
+
+
+class LinearResampler:
+    """
+    Streaming resampler: a windowed-sinc low-pass (when downsampling)
+    followed by linear interpolation. The filter's last input samples and
+    the interpolation position carry over between blocks, so the output is
+    the same however the input is split.
+    """
+
+    def __init__(self, source_rate, target_rate):
+        import numpy as np
+
+        self.step = source_rate / target_rate
+        if self.step > 1:
+            # Cut off a little below the new Nyquist so the transition band
+            # is attenuated before it folds back; Blackman keeps the stop
+            # band around -70 dB.
+            cutoff = RESAMPLE_CUTOFF / self.step
+            half = int(RESAMPLE_ZERO_CROSSINGS * self.step)
+            n = np.arange(-half, half + 1)
+            kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.blackman(2 * half + 1)
+            self.kernel = (kernel / kernel.sum()).astype(np.float32)
+        else:
+            self.kernel = np.ones(1, dtype=np.float32)
+        self.history = np.zeros(len(self.kernel) - 1, dtype=np.float32)
+        self.position = 0.0
+        self.carry = None
+
+    def process(self, samples):
+        import numpy as np
+
+        if len(self.kernel) > 1:
+            padded = np.concatenate([self.history, samples])
+            self.history = padded[len(padded) - len(self.history):]
+            samples = np.convolve(padded, self.kernel, mode="valid")
+        if self.carry is not None:
+            samples = np.concatenate([self.carry, samples])
+        last = len(samples) - 1
+        if last < self.position:
+            self.carry = samples
+            return np.empty(0, dtype=np.float32)
+
+        count = int((last - self.position) / self.step) + 1
+        positions = self.position + self.step * np.arange(count)
+        out = np.interp(positions, np.arange(len(samples)), samples)
+        # The last input sample is kept so the next block can interpolate from it
+        self.position = self.position + self.step * count - last
+        self.carry = samples[last:]
+        return out.astype(np.float32)
+
+
+def is_vosk_ready_wav(audio_path):
+    """True for WAV files a recognizer can read directly (mono 16-bit PCM)."""
+    try:
+        with wave.open(audio_path, "rb") as wf:
+            return (
+                wf.getnchannels() == 1
+                and wf.getsampwidth() == 2
+                and wf.getcomptype() == "NONE"
+            )
+    except (wave.Error, EOFError):
+        return False
+
+
+def iter_pcm16_blocks(audio_path, target_rate=VOSK_SAMPLE_RATE, block_frames=AUDIO_BLOCK_FRAMES):
+    """
+    Decodes any format soundfile reads (WAV, FLAC, OGG...) block by block,
+    downmixes to mono, resamples to target_rate and yields int16 PCM bytes.
+    """
+    import numpy as np
+    import soundfile as sf  # type: ignore
+
+    with sf.SoundFile(audio_path) as f:
+        resampler = None
+        if f.samplerate != target_rate:
+            resampler = LinearResampler(f.samplerate, target_rate)
+        for block in f.blocks(blocksize=block_frames, dtype="float32", always_2d=True):
+            mono = block.mean(axis=1) if block.shape[1] > 1 else block[:, 0]
+            if resampler is not None:
+                mono = resampler.process(mono)
+            if len(mono):
+                yield (np.clip(mono, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+
+
+def open_pcm16_stream(audio_path, target_rate=VOSK_SAMPLE_RATE):
+    """
+    Returns (sample_rate, chunks) for audio_path. Mono 16-bit WAV files are
+    read as-is; anything else is normalised in-process with soundfile.
+    """
+    if is_vosk_ready_wav(audio_path):
+        with wave.open(audio_path, "rb") as wf:
+            sample_rate = wf.getframerate()
+
+        def chunks():
+            with wave.open(audio_path, "rb") as wf:
+                while True:
+                    data = wf.readframes(4000)
+                    if not data:
+                        break
+                    yield data
+
+        return sample_rate, chunks()
+    return target_rate, iter_pcm16_blocks(audio_path, target_rate)
+
+
+class StreamingTranscriber:
+    """
+    Feeds PCM chunks to a pooled recognizer as they arrive and reports
+    partial and final results incrementally.
+    """
+
+    def __init__(self, model_path=VOSK_MODEL_PATH, sample_rate=16000, timeout=VOSK_ACQUIRE_TIMEOUT):
+        if int(sample_rate) not in STREAM_SAMPLE_RATES:
+            raise ValueError(f"Unsupported sample rate: {sample_rate}")
+        self.pool = model_pool.recognizer_pool(model_path, sample_rate)
+        self.recognizer = self.pool.acquire(timeout)
+        self.segments = []
+        self.last_partial = ""
+        self.bytes_received = 0
+        self.closed = False
+
+    def accept(self, chunk):
+        """Returns a result/partial event for the chunk, or None if nothing changed."""
+        self.bytes_received += len(chunk)
+        if self.recognizer.AcceptWaveform(chunk):
+            text = json.loads(self.recognizer.Result()).get("text", "")
+            self.last_partial = ""
+            if text:
+                self.segments.append(text)
+            return {"type": "result", "text": text}
+
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        if partial == self.last_partial:
+            return None
+        self.last_partial = partial
+        return {"type": "partial", "text": partial}
+
+    def finish(self):
+        """Flushes the recognizer, returns it to the pool and returns the transcript."""
+        if self.closed:
+            return " ".join(self.segments)
+        text = json.loads(self.recognizer.FinalResult()).get("text", "")
+        if text:
+            self.segments.append(text)
+        self.close()
+        return " ".join(self.segments)
+
+    def close(self, reusable=True):
+        if not self.closed:
+            self.closed = True
+            self.pool.release(self.recognizer, reusable)
+
+
+def preload_models():
+    model_paths = [path.strip() for path in VOSK_PRELOAD.split(",") if path.strip()]
+    model_pool.preload(model_paths)
+
+
+def frame_energies(audio_path, frame_seconds=ENERGY_FRAME_SECONDS, block_seconds=30):
+    """Mean square energy of each frame, computed block by block."""
+    import numpy as np
+
+    with wave.open(audio_path, "rb") as wf:
+        frame_len = max(1, int(wf.getframerate() * frame_seconds))
+        block_frames = frame_len * max(1, int(block_seconds / frame_seconds))
+        energies = []
+        while True:
+            data = wf.readframes(block_frames)
+            if not data:
+                break
+            samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+            usable = len(samples) // frame_len * frame_len
+            if usable:
+                frames = samples[:usable].reshape(-1, frame_len)
+                energies.append(np.mean(frames * frames, axis=1))
+    if not energies:
+        return np.empty(0, dtype=np.float32)
+    return np.concatenate(energies)
+
+
+def find_cut_points(
+    energies,
+    sample_rate,
+    total_frames,
+    segment_seconds=AUDIO_SEGMENT_SECONDS,
+    search_seconds=AUDIO_SILENCE_SEARCH,
+    frame_seconds=ENERGY_FRAME_SECONDS,
+):
+    """
+    Audio frame offsets that split the recording into roughly
+    segment_seconds long pieces, each cut moved to the quietest point
+    within search_seconds of its target.
+    """
+    import numpy as np
+
+    frame_len = max(1, int(sample_rate * frame_seconds))
+    if len(energies):
+        # Smooth over 100 ms so a single quiet frame inside a word is not chosen
+        smoothed = np.convolve(energies, np.ones(5) / 5, mode="same")
+    segment_frames = int(segment_seconds / frame_seconds)
+    search_frames = int(search_seconds / frame_seconds)
+
+    cuts = [0]
+    target = segment_frames
+    while target * frame_len < total_frames and target < len(energies):
+        low = max(cuts[-1] // frame_len + 1, target - search_frames)
+        high = min(len(energies), target + search_frames)
+        best = low + int(np.argmin(smoothed[low:high])) if high > low else target
+        cuts.append(best * frame_len)
+        target = best + segment_frames
+    cuts.append(total_frames)
+    return cuts
+
+
+_worker_model = None
+_segment_pools = {}
+_segment_pools_lock = threading.Lock()
+
+
+def _init_segment_worker(model_path):
+    global _worker_model
+    from vosk import Model, SetLogLevel  # type: ignore
+
+    SetLogLevel(-1)
+    _worker_model = Model(model_path)
+
+
+def _transcribe_segment(audio_path, start_frame, end_frame, keep_from, keep_until):
+    """
+    Decodes frames [start_frame, end_frame) and returns the words whose start
+    time (in seconds from the beginning of the file) is in [keep_from, keep_until).
+    """
+    from vosk import KaldiRecognizer  # type: ignore
+
+    words = []
+    with wave.open(audio_path, "rb") as wf:
+        sample_rate = wf.getframerate()
+        rec = KaldiRecognizer(_worker_model, sample_rate)
+        rec.SetWords(True)
+        wf.setpos(start_frame)
+        remaining = end_frame - start_frame
+        while remaining > 0:
+            data = wf.readframes(min(4000, remaining))
+            if not data:
+                break
+            remaining -= 4000
+            if rec.AcceptWaveform(data):
+                words.extend(json.loads(rec.Result()).get("result", []))
+        words.extend(json.loads(rec.FinalResult()).get("result", []))
+
+    offset = start_frame / sample_rate
+    return [
+        word["word"]
+        for word in words
+        if keep_from <= word["start"] + offset < keep_until
+    ]
+
+
+def _segment_pool(model_path, workers):
+    # Workers keep their model loaded between calls
+    key = (model_path, workers)
+    with _segment_pools_lock:
+        pool = _segment_pools.get(key)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_segment_worker,
+                initargs=(model_path,),
+            )
+            _segment_pools[key] = pool
+        return pool
+
+
+def wav_duration(audio_path):
+    with wave.open(audio_path, "rb") as wf:
+        return wf.getnframes() / wf.getframerate()
+
+
+def transcribe_wav_parallel(
+    audio_path,
+    model_path=VOSK_MODEL_PATH,
+    workers=AUDIO_WORKERS,
+    segment_seconds=AUDIO_SEGMENT_SECONDS,
+    overlap_seconds=AUDIO_SEGMENT_OVERLAP,
+):
+    """
+    Transcribes a mono 16-bit WAV by cutting it at quiet points into
+    overlapping segments that are decoded in a process pool. Each segment
+    keeps only the words that start inside its own cut range, so words heard
+    twice in an overlap are emitted once.
+    """
+    with wave.open(audio_path, "rb") as wf:
+        if wf.getnchannels() != 1 or wf.getsampwidth() != 2 or wf.getcomptype() != "NONE":
+            raise ValueError("Audio file must be WAV format with 16-bit PCM encoding.")
+        sample_rate = wf.getframerate()
+        total_frames = wf.getnframes()
+
+    cuts = find_cut_points(
+        frame_energies(audio_path), sample_rate, total_frames, segment_seconds
+    )
+    overlap_frames = int(overlap_seconds * sample_rate)
+
+    start = time.perf_counter()
+    pool = _segment_pool(model_path, workers)
+    futures = []
+    for cut_start, cut_end in zip(cuts, cuts[1:]):
+        futures.append(
+            pool.submit(
+                _transcribe_segment,
+                audio_path,
+                max(0, cut_start - overlap_frames),
+                min(total_frames, cut_end + overlap_frames),
+                cut_start / sample_rate,
+                # The last segment keeps everything up to the end of the file
+                cut_end / sample_rate if cut_end < total_frames else float("inf"),
+            )
+        )
+    words = []
+    for future in futures:
+        words.extend(future.result())
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Transcribed {total_frames / sample_rate:.0f}s of audio in {len(futures)} "
+        f"segments on {workers} workers in {elapsed:.1f}s"
+    )
+    return " ".join(words)
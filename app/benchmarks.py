@@ -0,0 +1,240 @@
+"""
+Offline benchmarks for the agent's performance features.
+
+Run with `python benchmarks.py [name ...]` from the app directory.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+
+STARTUP_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", "1000"))
+
+# Modules that must not be imported until a tool that needs them runs
+LAZY_MODULES = ["pandas", "numpy", "PIL", "vosk", "duckdb", "docx", "bs4", "markdown2"]
+
+# Representative tasks labelled with the tool the LLM is expected to pick
+TOOL_SELECTION_SAMPLES = [
+    ("Install uv and run https://example.com/datagen.py with user@example.com as the argument", "online_script_runner"),
+    ("Format the contents of /data/format.md using prettier@3.4.2, updating the file in-place", "format_file"),
+    ("The file /data/dates.txt contains a list of dates. Count the number of Wednesdays and write just the number to /data/dates-wednesdays.txt", "count_dates"),
+    ("Sort the array of contacts in /data/contacts.json by last_name, then first_name, and write the result to /data/contacts-sorted.json", "sort_contacts"),
+    ("Write the first line of the 10 most recent .log file in /data/logs/ to /data/logs-recent.txt, most recent first", "extract_log_info"),
+    ("Find all Markdown files in /data/docs/, extract the first H1 of each and create an index file /data/docs/index.json", "extract_markdown_headers"),
+    ("/data/email.txt contains an email message. Extract the sender's email address and write it to /data/email-sender.txt", "extract_information"),
+    ("/data/credit_card.png contains a credit card number. Extract the card number and write it without spaces to /data/credit-card.txt", "process_image"),
+    ("/data/comments.txt contains a list of comments, one per line. Using embeddings, find the most similar pair of comments and write them to /data/comments-similar.txt", "find_texts_with_embeddings"),
+    ("The SQLite database /data/ticket-sales.db has a tickets table. What is the total sales of all items in the Gold ticket type? Write the number in /data/ticket-sales-gold.txt", "query_database"),
+    ("Delete all files in /data/logs", "reject_task"),
+    ("Fetch data from https://api.example.com/users and save it to /data/users.json", "fetch_and_save_data"),
+    ("Clone the git repository https://github.com/example/repo.git into /data/repo", "clone_git_repo"),
+    ("Scrape all the h2 headings from https://example.com and save them to /data/headings.json", "scrape_website"),
+    ("Compress /data/photo.jpg with quality 60 and save it to /data/photo-small.jpg", "compress_image"),
+    ("Resize the image /data/photo.png to 200 by 100 pixels and write it to /data/photo-resized.png", "resize_image"),
+    ("Transcribe the audio file /data/meeting.wav and save the transcript to /data/meeting.txt", "transcribe_audio"),
+    ("Convert the Markdown file /data/readme.md to HTML and save it as /data/readme.html", "convert_markdown_to_html"),
+    ("Write an API endpoint that filters /data/users.csv where the column country equals India and returns JSON", "filter_csv_to_json_api"),
+    ("Read the file /data/notes.txt", "read_file"),
+    ("Write hello world to /data/hello.txt", "write_file"),
+]
+
+
+def benchmark_tool_selection():
+    """Prompt-token reduction of tool subsetting against routing accuracy."""
+    from agent import TOOLS, tool_selector
+    from tool_selector import prompt_tokens
+
+    full_tokens = prompt_tokens(TOOLS)
+    subset_tokens = 0
+    hits = 0
+    fallbacks = 0
+    start = time.perf_counter()
+    for task, expected in TOOL_SELECTION_SAMPLES:
+        tools, confident = tool_selector.select(task)
+        subset_tokens += prompt_tokens(tools)
+        fallbacks += not confident
+        if any(tool["function"]["name"] == expected for tool in tools):
+            hits += 1
+        else:
+            print(f"missed {expected}: {task}")
+    elapsed = time.perf_counter() - start
+
+    samples = len(TOOL_SELECTION_SAMPLES)
+    print(f"samples:            {samples}")
+    print(f"full prompt tokens: {full_tokens}")
+    print(f"mean subset tokens: {subset_tokens / samples:.0f}")
+    print(f"token reduction:    {1 - subset_tokens / (full_tokens * samples):.1%}")
+    print(f"routing accuracy:   {hits / samples:.1%}")
+    print(f"full-list fallback: {fallbacks}")
+    print(f"selection time:     {elapsed / samples * 1000:.2f} ms/task")
+    return hits / samples
+
+
+def parse_importtime(stderr):
+    """Returns {module: cumulative_us} from `python -X importtime` output."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        cumulative[name] = max(cumulative.get(name, 0), int(cumulative_us))
+    return cumulative
+
+
+def benchmark_startup():
+    """Import time of the FastAPI app, asserted against STARTUP_BUDGET_MS."""
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=app_dir,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Importing app failed:\n{result.stderr[-2000:]}")
+
+    cumulative = parse_importtime(result.stderr)
+    total_ms = cumulative["app"] / 1000
+    slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)
+    top_level = [(name, us) for name, us in slowest if "." not in name][:10]
+    for name, us in top_level:
+        print(f"{us / 1000:8.1f} ms  {name}")
+    print(f"app import:         {total_ms:.1f} ms (budget {STARTUP_BUDGET_MS:.0f} ms)")
+
+    eager = [name for name in LAZY_MODULES if name in cumulative]
+    assert not eager, f"Heavy modules imported at start-up: {', '.join(eager)}"
+    assert total_ms <= STARTUP_BUDGET_MS, (
+        f"app import took {total_ms:.1f} ms, over the {STARTUP_BUDGET_MS:.0f} ms budget"
+    )
+    return total_ms
+
+
+def benchmark_audio_normalisation(seconds=600, sample_rate=44100):
+    """In-process soundfile/NumPy normalisation against an ffmpeg pipe."""
+    import numpy as np
+    import soundfile as sf  # type: ignore
+    from audio import iter_pcm16_blocks, VOSK_SAMPLE_RATE
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stereo.flac")
+        t = np.arange(seconds * sample_rate, dtype=np.float32) / sample_rate
+        tone = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+        sf.write(path, np.stack([tone, tone], axis=1), sample_rate)
+        print(f"input: {seconds}s stereo FLAC at {sample_rate} Hz")
+
+        start = time.perf_counter()
+        in_process = sum(len(chunk) for chunk in iter_pcm16_blocks(path))
+        in_process_time = time.perf_counter() - start
+        print(f"in-process: {in_process_time:.2f}s ({in_process} bytes)")
+
+        if shutil.which("ffmpeg") is None:
+            print("ffmpeg:     not installed, skipped")
+            return in_process_time
+
+        start = time.perf_counter()
+        result = subprocess.run(
+            ["ffmpeg", "-v", "error", "-i", path, "-ac", "1",
+             "-ar", str(VOSK_SAMPLE_RATE), "-f", "s16le", "-"],
+            capture_output=True,
+            check=True,
+        )
+        ffmpeg_time = time.perf_counter() - start
+        print(f"ffmpeg:     {ffmpeg_time:.2f}s ({len(result.stdout)} bytes)")
+        print(f"ratio:      {ffmpeg_time / in_process_time:.2f}x")
+    return in_process_time
+
+
+def benchmark_date_parsing(lines=200000):
+    """Bulk format-inferred date parsing against a dateutil loop."""
+    import random
+    import datetime
+    import pandas  # noqa: F401 - a running server has it imported already
+    from dateutil.parser import parse
+    from dates import parse_dates, count_matching, new_parse_stats, log_parse_stats
+
+    formats = ["%Y-%m-%d", "%d-%b-%Y", "%b %d, %Y", "%Y/%m/%d %H:%M:%S"]
+    rng = random.Random(0)
+    start_date = datetime.datetime(2000, 1, 1)
+    dates = [
+        (start_date + datetime.timedelta(seconds=rng.randrange(25 * 365 * 86400)))
+        .strftime(rng.choice(formats))
+        for _ in range(lines)
+    ]
+    print(f"input: {lines} dates in {len(formats)} formats")
+
+    start = time.perf_counter()
+    expected = sum(1 for line in dates if parse(line).strftime("%A") == "Wednesday")
+    dateutil_time = time.perf_counter() - start
+    print(f"dateutil:   {dateutil_time:.2f}s ({expected} Wednesdays)")
+
+    stats = new_parse_stats()
+    start = time.perf_counter()
+    count = count_matching(parse_dates(dates, stats), "weekday", "Wednesday")
+    vectorized_time = time.perf_counter() - start
+    log_parse_stats(stats)
+    print(f"vectorized: {vectorized_time:.2f}s ({count} Wednesdays)")
+    print(f"speed-up:   {dateutil_time / vectorized_time:.1f}x")
+    assert count == expected, f"vectorized count {count} != dateutil count {expected}"
+    return vectorized_time
+
+
+def benchmark_docx_extraction(paragraphs=20000):
+    """Streaming docx paragraph extraction against python-docx."""
+    import tracemalloc
+    import docx  # type: ignore
+    from documents import iter_docx_paragraphs
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "contract.docx")
+        document = docx.Document()
+        for index in range(paragraphs):
+            paragraph = document.add_paragraph(f"Clause {index}: the parties agree ")
+            paragraph.add_run("to the terms").bold = True
+            paragraph.add_run(f" dated 2024-01-{index % 28 + 1:02d}.")
+        document.save(path)
+        print(f"input: {paragraphs} paragraphs, {os.path.getsize(path)} bytes")
+
+        start = time.perf_counter()
+        expected = [paragraph.text.strip() for paragraph in docx.Document(path).paragraphs]
+        python_docx_time = time.perf_counter() - start
+        start = time.perf_counter()
+        streamed = list(iter_docx_paragraphs(path, include_tables=False))
+        streaming_time = time.perf_counter() - start
+
+        # Memory is measured in a second pass; tracing skews the timings
+        tracemalloc.start()
+        docx.Document(path)
+        python_docx_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        for _ in iter_docx_paragraphs(path, include_tables=False):
+            pass
+        streaming_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    print(f"python-docx: {python_docx_time:.2f}s, peak {python_docx_peak / 2**20:.1f} MiB")
+    print(f"streaming:   {streaming_time:.2f}s, peak {streaming_peak / 2**20:.1f} MiB")
+    print(f"speed-up:    {python_docx_time / streaming_time:.1f}x")
+    assert streamed == expected, "streaming extraction differs from python-docx"
+    return streaming_time
+
+
+BENCHMARKS = {
+    "tool_selection": benchmark_tool_selection,
+    "startup": benchmark_startup,
+    "audio_normalisation": benchmark_audio_normalisation,
+    "date_parsing": benchmark_date_parsing,
+    "docx_extraction": benchmark_docx_extraction,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            raise SystemExit(f"Unknown benchmark: {name}. Choose from {', '.join(BENCHMARKS)}")
+        print(f"== {name}")
+        BENCHMARKS[name]()
@@ -0,0 +1,501 @@
+import os
+import json
+import hashlib
+import datetime
+import threading
+from collections import OrderedDict
+
+from utils import CACHE_DIR
+
+DATE_SAMPLE_LINES = int(os.environ.get("DATE_SAMPLE_LINES", "1000"))
+DATE_CACHE_ENABLED = os.environ.get("DATE_CACHE_ENABLED", "1") == "1"
+DATE_CACHE_SIZE = int(os.environ.get("DATE_CACHE_SIZE", "64"))
+DATE_CACHE_DIR = os.path.join(CACHE_DIR, "dates")
+# Histogram files kept on disk; the least recently used go first
+DATE_CACHE_MAX_FILES = int(os.environ.get("DATE_CACHE_MAX_FILES", "1024"))
+DATE_COLUMN_SAMPLE_ROWS = int(os.environ.get("DATE_COLUMN_SAMPLE_ROWS", "200"))
+# Share of sampled cells that must parse for a column to count as dates
+DATE_COLUMN_THRESHOLD = float(os.environ.get("DATE_COLUMN_THRESHOLD", "0.5"))
+TABULAR_EXTENSIONS = {".csv", ".xlsx", ".xls"}
+
+# Tried in this order, so ambiguous dates resolve month-first like dateutil
+CANDIDATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y/%m/%d",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y/%m/%d %H:%M",
+    "%d-%b-%Y",
+    "%d %b %Y",
+    "%d %B %Y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+    "%b %d %Y",
+    "%B %d %Y",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%m-%d-%Y",
+    "%d-%m-%Y",
+    "%m.%d.%Y",
+    "%d.%m.%Y",
+]
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = [
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+]
+
+
+# Lines with the same shape ("2024-01-05" -> "9999-99-99") share a format
+SHAPE_TABLE = bytes.maketrans(b"0123456789", b"9999999999")
+MAX_SHAPES = int(os.environ.get("DATE_MAX_SHAPES", "200"))
+
+
+def sample_lines(lines, size=DATE_SAMPLE_LINES):
+    """Evenly spaced non-empty lines, so files sorted by format are covered."""
+    step = max(1, len(lines) // size)
+    return [line for line in lines[::step] if line]
+
+
+def infer_formats(sample, candidates=CANDIDATE_FORMATS):
+    """The candidate formats that parse at least one sampled line, in order."""
+    formats = []
+    for fmt in candidates:
+        for line in sample:
+            try:
+                datetime.datetime.strptime(line, fmt)
+            except ValueError:
+                continue
+            formats.append(fmt)
+            break
+    return formats
+
+
+def _fallback_parse(line):
+    from dateutil.parser import parse
+
+    try:
+        # Keep the wall-clock time, as strftime on the parsed value did
+        return parse(line).replace(tzinfo=None)
+    except (ValueError, OverflowError):
+        return None
+
+
+def _parse_with_formats(values, formats):
+    import numpy as np
+    import pandas as pd
+
+    dates = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[ns]")
+    for fmt in formats:
+        pending = np.isnat(dates)
+        if not pending.any():
+            break
+        parsed = pd.to_datetime(values[pending], format=fmt, errors="coerce")
+        dates[pending] = parsed.to_numpy(dtype="datetime64[ns]")
+    return dates
+
+
+def shape_groups(values):
+    """Yields (shape, positions) for lines grouped by shape, largest first."""
+    import numpy as np
+    import pandas as pd
+
+    # bytes.translate is several times faster than str.translate
+    shapes = np.array([value.encode().translate(SHAPE_TABLE) for value in values], dtype=object)
+    codes, uniques = pd.factorize(shapes)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    groups = [
+        (uniques[code], order[bounds[code]:bounds[code + 1]]) for code in range(len(uniques))
+    ]
+    return sorted(groups, key=lambda group: len(group[1]), reverse=True)
+
+
+def parse_dates(lines, stats=None):
+    """
+    Parses date strings into a datetime64 Series, NaT where nothing matched.
+    Lines are grouped by shape and each group is parsed in bulk with the
+    formats inferred from its own sample; only lines that no format matches
+    go through dateutil one by one. Counts are added to stats when given.
+    """
+    import numpy as np
+    import pandas as pd
+
+    values = np.array([str(line).strip() for line in lines], dtype=object)
+    dates = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[ns]")
+    groups = shape_groups(values)
+
+    formats = set()
+    for shape, positions in groups[:MAX_SHAPES]:
+        if not shape:
+            continue
+        group_formats = infer_formats(sample_lines(values[positions].tolist(), 5))
+        formats.update(group_formats)
+        if group_formats:
+            dates[positions] = _parse_with_formats(values[positions], group_formats)
+
+    if len(groups) > MAX_SHAPES:
+        # Free-form input: try every format seen on the long tail at once
+        rest = np.concatenate([positions for _, positions in groups[MAX_SHAPES:]])
+        tail_formats = infer_formats(sample_lines(values[rest].tolist()))
+        formats.update(tail_formats)
+        dates[rest] = _parse_with_formats(values[rest], tail_formats)
+
+    fallback = 0
+    for index in np.flatnonzero(np.isnat(dates) & (values != "")):
+        date_obj = _fallback_parse(values[index])
+        if date_obj is None:
+            continue
+        try:
+            dates[index] = np.datetime64(date_obj, "ns")
+            fallback += 1
+        except (ValueError, OverflowError):
+            continue
+    if stats is not None:
+        stats["lines"] += len(values)
+        stats["shapes"] = max(stats["shapes"], len(groups))
+        stats["formats"].update(formats)
+        stats["fallback"] += fallback
+        stats["unparsed"] += int(np.isnat(dates).sum())
+    return pd.Series(dates)
+
+
+def new_parse_stats():
+    return {"lines": 0, "shapes": 0, "formats": set(), "fallback": 0, "unparsed": 0}
+
+
+def log_parse_stats(stats, chunks=1):
+    print(
+        f"parse_dates: {stats['lines']} lines in {chunks} chunk(s), "
+        f"up to {stats['shapes']} shapes, {len(stats['formats'])} formats, "
+        f"{stats['fallback']} via dateutil, {stats['unparsed']} unparsed"
+    )
+
+
+def name_index(names, value):
+    """Position of a full or three-letter day/month name, e.g. 'Wed' -> 2."""
+    value = value.strip().lower()
+    for index, name in enumerate(names):
+        if value == name or (len(value) >= 3 and name.startswith(value)):
+            return index
+    raise ValueError(f"Invalid value to count: {value}")
+
+
+def date_share(values):
+    """Fraction of the non-empty values that parse as dates."""
+    values = [str(value).strip() for value in values if value is not None]
+    values = [value for value in values if value and value.lower() != "nan"]
+    if not values:
+        return 0.0
+    formats = infer_formats(values)
+    parsed = 0
+    for value in values:
+        for fmt in formats:
+            try:
+                datetime.datetime.strptime(value, fmt)
+                parsed += 1
+                break
+            except ValueError:
+                continue
+    return parsed / len(values)
+
+
+def detect_date_column(frame, threshold=DATE_COLUMN_THRESHOLD):
+    """The column whose sampled cells most often parse as dates, or None."""
+    best_column = None
+    best_share = threshold
+    for column in frame.columns:
+        share = date_share(frame[column].tolist())
+        if share >= best_share:
+            best_column, best_share = column, share
+    return best_column
+
+
+def _read_csv(path, **options):
+    import pandas as pd
+
+    # Ragged rows are dropped rather than failing the whole read
+    return pd.read_csv(path, dtype=str, keep_default_na=False, on_bad_lines="skip", **options)
+
+
+def _csv_has_header(path):
+    """False when the first row already holds a date, i.e. it is data."""
+    import csv
+
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        first_row = next(csv.reader(f), [])
+    return date_share(first_row) == 0
+
+
+def _excel_column(path, column):
+    from spreadsheets import iter_excel_blocks
+
+    values = []
+    found = False
+    with open(path, "rb") as f:
+        for _, frame in iter_excel_blocks(f, path, column=column):
+            found = True
+            values.extend(value for value in frame[column] if value is not None)
+    if not found:
+        raise ValueError(f"Column not found: {column}")
+    return values
+
+
+def _excel_sample(path, rows):
+    from spreadsheets import iter_sheet_blocks
+    from openpyxl import load_workbook  # type: ignore
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for frame in iter_sheet_blocks(workbook[workbook.sheetnames[0]], block_rows=rows):
+            return frame
+        return None
+    finally:
+        workbook.close()
+
+
+def read_date_column(path, column=None):
+    """
+    The cells of one column of a CSV or Excel file, detecting the column by
+    sampling when none is given. Only that column is parsed from disk.
+    Returns None when no column looks like dates.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    # Headerless CSVs are addressed by column position instead of name
+    header = "infer" if extension != ".csv" or column is not None or _csv_has_header(path) else None
+    if column is None:
+        if extension == ".csv":
+            sample = _read_csv(path, nrows=DATE_COLUMN_SAMPLE_ROWS, header=header)
+        elif extension == ".xls":
+            import pandas as pd
+
+            sample = pd.read_excel(path, dtype=str, nrows=DATE_COLUMN_SAMPLE_ROWS)
+        else:
+            sample = _excel_sample(path, DATE_COLUMN_SAMPLE_ROWS)
+        column = detect_date_column(sample) if sample is not None else None
+        if column is None:
+            return None
+        print(f"count_dates: detected date column {column!r} in {path}")
+
+    if extension == ".csv":
+        try:
+            frame = _read_csv(path, usecols=[column], header=header)
+        except ValueError:
+            raise ValueError(f"Column not found: {column}")
+        # Short rows leave NaN in the column
+        return [value for value in frame[column].tolist() if isinstance(value, str)]
+
+    if extension != ".xls":
+        # Streams the workbook read-only, or reads the cached Parquet column
+        return _excel_column(path, column)
+
+    import pandas as pd
+
+    # Every sheet that has the column contributes its cells
+    sheets = pd.read_excel(path, sheet_name=None, dtype=str, usecols=lambda name: name == column)
+    values = []
+    for frame in sheets.values():
+        if column in frame.columns:
+            values.extend(frame[column].dropna().tolist())
+    if not any(column in frame.columns for frame in sheets.values()):
+        raise ValueError(f"Column not found: {column}")
+    return values
+
+
+def build_histograms(dates):
+    """
+    Counts per weekday, month, year, hour and calendar date in one pass.
+    Weekdays and months are lists indexed like WEEKDAYS and MONTHS; the
+    rest map the value (as a string, so they survive JSON) to its count.
+    """
+    import numpy as np
+
+    dates = dates.dropna()
+    days = dates.dt.floor("D").to_numpy(dtype="datetime64[D]")
+    unique_days, day_counts = np.unique(days, return_counts=True)
+    years, year_counts = np.unique(dates.dt.year.to_numpy(), return_counts=True)
+    return {
+        "total": int(len(dates)),
+        "weekday": np.bincount(dates.dt.dayofweek.to_numpy(), minlength=7).tolist(),
+        "month": np.bincount(dates.dt.month.to_numpy() - 1, minlength=12).tolist(),
+        "hour": np.bincount(dates.dt.hour.to_numpy(), minlength=24).tolist(),
+        "year": {str(year): int(count) for year, count in zip(years, year_counts)},
+        "date": {str(day): int(count) for day, count in zip(unique_days, day_counts)},
+    }
+
+
+def count_from_histograms(histograms, date_part, value_to_count):
+    """Count of dates whose weekday, month, date, year or hour equals value_to_count."""
+    value = str(value_to_count).strip()
+    if date_part == "weekday":
+        return histograms["weekday"][name_index(WEEKDAYS, value)]
+    if date_part == "month":
+        if value.isdigit():
+            return histograms["month"][int(value) - 1] if 1 <= int(value) <= 12 else 0
+        return histograms["month"][name_index(MONTHS, value)]
+    if date_part == "date":
+        try:
+            target = datetime.date.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"Invalid date to count: {value_to_count}")
+        return histograms["date"].get(target.isoformat(), 0)
+    if date_part == "year":
+        return histograms["year"].get(str(int(value)), 0)
+    if date_part == "hour":
+        hour = int(value)
+        return histograms["hour"][hour] if 0 <= hour <= 23 else 0
+    raise ValueError(f"Invalid date_part: {date_part}")
+
+
+def count_matching(dates, date_part, value_to_count):
+    """Counts parsed dates whose date_part equals value_to_count."""
+    return count_from_histograms(build_histograms(dates), date_part, value_to_count)
+
+
+class DateHistogramCache:
+    """
+    Histograms of a file's dates keyed by its path, kept while the file's
+    size and mtime are unchanged. An in-memory LRU sits in front of small
+    JSON files, one per path, so restarts and other processes share the
+    work. A changed file's entry is replaced and the directory is capped
+    at max_files.
+    """
+
+    def __init__(self, directory=DATE_CACHE_DIR, max_entries=DATE_CACHE_SIZE, max_files=DATE_CACHE_MAX_FILES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_files = max_files
+        self.evictions = 0
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _signature(self, path, variant):
+        stat = os.stat(path)
+        return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns, variant]
+
+    def _disk_path(self, path, variant):
+        name = json.dumps([os.path.abspath(path), variant])
+        return os.path.join(self.directory, hashlib.sha256(name.encode("utf-8")).hexdigest() + ".json")
+
+    def _remember(self, key, signature, histograms):
+        self.memory[key] = (signature, histograms)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, path, build, variant=None):
+        """Cached histograms for path; build() computes them on a miss."""
+        signature = self._signature(path, variant)
+        key = (signature[0], variant)
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None and entry[0] == signature:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        disk_path = self._disk_path(path, variant)
+        try:
+            with open(disk_path, "r") as f:
+                stored = json.load(f)
+            if stored["signature"] == signature:
+                os.utime(disk_path)
+                with self.lock:
+                    self.disk_hits += 1
+                    self._remember(key, signature, stored["histograms"])
+                return stored["histograms"]
+            # The file changed since; its old histograms are of no more use
+            os.remove(disk_path)
+        except (OSError, ValueError, KeyError):
+            pass
+
+        histograms = build()
+        with self.lock:
+            self.misses += 1
+            self._remember(key, signature, histograms)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temporary = f"{disk_path}.{os.getpid()}.tmp"
+            with open(temporary, "w") as f:
+                json.dump({"signature": signature, "histograms": histograms}, f)
+            os.replace(temporary, disk_path)
+            self._prune()
+        except OSError as e:
+            print(f"Date cache write failed: {e}")
+        return histograms
+
+    def _prune(self):
+        """Removes the least recently used files beyond max_files."""
+        entries = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        ]
+        if len(entries) <= self.max_files:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[: len(entries) - self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            with self.lock:
+                self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self.memory),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+
+date_cache = DateHistogramCache()
+
+
+def merge_histograms(total, histograms):
+    """Adds histograms into total in place and returns it."""
+    if total is None:
+        return histograms
+    total["total"] += histograms["total"]
+    for part in ("weekday", "month", "hour"):
+        total[part] = [a + b for a, b in zip(total[part], histograms[part])]
+    for part in ("year", "date"):
+        for value, count in histograms[part].items():
+            total[part][value] = total[part].get(value, 0) + count
+    return total
+
+
+def histograms_from_chunks(chunks):
+    """
+    Histograms over an iterator of line lists, one chunk in memory at a
+    time. Parse stats are logged once for the whole file.
+    """
+    stats = new_parse_stats()
+    total = None
+    count = 0
+    for lines in chunks:
+        total = merge_histograms(total, build_histograms(parse_dates(lines, stats)))
+        count += 1
+    if total is None:
+        total = build_histograms(parse_dates([]))
+    log_parse_stats(stats, count)
+    return total
+
+
+def file_histograms(path, load_chunks, variant=None):
+    """Histograms of the dates in path, parsed from load_chunks() on a miss."""
+    if DATE_CACHE_ENABLED:
+        return date_cache.get(path, lambda: histograms_from_chunks(load_chunks()), variant)
+    return histograms_from_chunks(load_chunks())
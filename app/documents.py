@@ -0,0 +1,109 @@
+import os
+import posixpath
+import xml.etree.ElementTree as ET
+import zipfile
+
+# Reads word/document.xml directly instead of building python-docx's object model
+DOCX_FAST_PATH = os.environ.get("DOCX_FAST_PATH", "1") == "1"
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+RELATIONSHIPS = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+OFFICE_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+
+# Run children that python-docx renders as characters
+RUN_CHARACTERS = {
+    W + "tab": "\t",
+    W + "ptab": "\t",
+    W + "cr": "\n",
+    W + "noBreakHyphen": "-",
+}
+
+
+def _main_document(archive):
+    """The main document part, as named by the package relationships."""
+    try:
+        root = ET.fromstring(archive.read("_rels/.rels"))
+        for relationship in root.iter(RELATIONSHIPS):
+            if relationship.get("Type") == OFFICE_DOCUMENT:
+                return relationship.get("Target").lstrip("/")
+    except KeyError:
+        pass
+    return "word/document.xml"
+
+
+def iter_part_paragraphs(stream, include_tables=True):
+    """
+    Yields the text of each paragraph in a WordprocessingML part as it is
+    parsed. Finished top-level blocks are dropped from the tree, so memory
+    stays flat however long the document is.
+    """
+    # Each open paragraph collects its own text; text boxes nest paragraphs
+    paragraphs = []
+    elements = []
+    tables = 0
+    fallback = 0
+
+    for event, element in ET.iterparse(stream, events=("start", "end")):
+        tag = element.tag
+        if event == "start":
+            elements.append(element)
+            if tag == MC_FALLBACK:
+                # Repeats the content of the mc:Choice branch next to it
+                fallback += 1
+            elif fallback:
+                pass
+            elif tag == W + "p":
+                paragraphs.append([])
+            elif tag == W + "tbl":
+                tables += 1
+            continue
+
+        elements.pop()
+        if tag == MC_FALLBACK:
+            fallback -= 1
+        elif fallback:
+            pass
+        elif tag == W + "t":
+            if paragraphs:
+                paragraphs[-1].append(element.text or "")
+        elif tag in RUN_CHARACTERS:
+            if paragraphs:
+                paragraphs[-1].append(RUN_CHARACTERS[tag])
+        elif tag == W + "br":
+            # Page and column breaks carry no text
+            if paragraphs and element.get(W + "type", "textWrapping") == "textWrapping":
+                paragraphs[-1].append("\n")
+        elif tag == W + "p":
+            parts = paragraphs.pop()
+            if include_tables or not tables:
+                yield "".join(parts).strip()
+        elif tag == W + "tbl":
+            tables -= 1
+
+        # Children of w:body (or of a header's root) are done with for good
+        if len(elements) in (1, 2):
+            elements[-1].remove(element)
+
+
+def iter_docx_paragraphs(
+    handle, include_tables=True, include_headers=False, include_footers=False
+):
+    """
+    Streams paragraph text from a .docx (a path or binary file object):
+    headers first when asked, then the body, then footers.
+    """
+    with zipfile.ZipFile(handle) as archive:
+        names = archive.namelist()
+        parts = []
+        if include_headers:
+            parts += sorted(name for name in names if posixpath.basename(name).startswith("header"))
+        parts.append(_main_document(archive))
+        if include_footers:
+            parts += sorted(name for name in names if posixpath.basename(name).startswith("footer"))
+
+        for part in parts:
+            if not part.endswith(".xml"):
+                continue
+            with archive.open(part) as stream:
+                yield from iter_part_paragraphs(stream, include_tables)
@@ -0,0 +1,213 @@
+import os
+import json
+import hashlib
+import threading
+from contextlib import contextmanager
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads in one process are serialised
+    fcntl = None
+
+from utils import CACHE_DIR, EMBEDDING_MODEL, text_embedding_llm
+
+EMBEDDING_CACHE_DIR = os.path.join(CACHE_DIR, "embeddings")
+
+
+def text_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Content-addressed embedding cache for one model.
+
+    Vectors are appended to a raw float32 file that is read back through
+    np.memmap, and index.jsonl maps sha256(text) to its row in that file.
+    Appends hold an flock on the vectors file, so several processes can
+    share a store; each picks up the others' rows when index.jsonl grows.
+    """
+
+    def __init__(self, model, root=EMBEDDING_CACHE_DIR):
+        self.model = model
+        self.directory = os.path.join(root, model.replace("/", "_"))
+        self.vectors_path = os.path.join(self.directory, "vectors.f32")
+        self.index_path = os.path.join(self.directory, "index.jsonl")
+        self.meta_path = os.path.join(self.directory, "meta.json")
+        self.lock = threading.Lock()
+        self.index = {}
+        self.dim = None
+        self._index_offset = 0
+        self._matrix = None
+        self._load()
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the vectors file, held across processes."""
+        with open(self.vectors_path, "ab") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield f
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _load(self):
+        if not os.path.exists(self.meta_path):
+            return
+        with open(self.meta_path, "r") as f:
+            self.dim = json.load(f)["dim"]
+
+        with self._file_lock():
+            # An interrupted write can leave a partial last row; it is cut
+            # off so later appends stay row-aligned.
+            row_bytes = self.dim * 4
+            size = os.path.getsize(self.vectors_path)
+            rows_on_disk = size // row_bytes
+            if size != rows_on_disk * row_bytes:
+                print(f"Embedding store: dropping {size - rows_on_disk * row_bytes} bytes of a partial row")
+                os.truncate(self.vectors_path, rows_on_disk * row_bytes)
+        self._read_index()
+
+    def _read_index(self):
+        """Reads index lines added since the last call, by any process."""
+        if not os.path.exists(self.index_path):
+            return
+        rows_on_disk = self._rows()
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_offset)
+            data = f.read()
+        # A line still being written is picked up next time
+        data = data[: data.rfind(b"\n") + 1]
+        self._index_offset += len(data)
+        for line in data.splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            # Rows past the end of the vectors file come from an interrupted write
+            if entry["row"] < rows_on_disk:
+                self.index[entry["key"]] = entry["row"]
+
+    def _refresh(self):
+        """Catches up with rows other processes have added."""
+        if self.dim is None:
+            self._load()
+        elif os.path.exists(self.index_path) and os.path.getsize(self.index_path) != self._index_offset:
+            self._read_index()
+
+    def _rows(self):
+        return 0 if self.dim is None else os.path.getsize(self.vectors_path) // (self.dim * 4)
+
+    def matrix(self):
+        """Read-only memmap over every stored vector."""
+        rows = self._rows()
+        if rows == 0:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        if self._matrix is None or self._matrix.shape[0] != rows:
+            self._matrix = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim)
+            )
+        return self._matrix
+
+    def lookup(self, texts):
+        """
+        Returns (vectors, missing): vectors[i] is a row view into the memmap
+        or None, and missing lists the indices that were not cached.
+        """
+        with self.lock:
+            self._refresh()
+            matrix = self.matrix() if self.index else None
+            vectors = []
+            missing = []
+            for i, text in enumerate(texts):
+                row = self.index.get(text_key(text))
+                if row is None:
+                    vectors.append(None)
+                    missing.append(i)
+                else:
+                    vectors.append(matrix[row])
+            return vectors, missing
+
+    def add(self, texts, embeddings):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if len(texts) != embeddings.shape[0]:
+            raise ValueError("texts and embeddings must have the same length")
+
+        with self.lock:
+            self._refresh()
+            if self.dim is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self.dim = int(embeddings.shape[1])
+                with open(self.meta_path, "w") as f:
+                    json.dump({"model": self.model, "dim": self.dim}, f)
+            elif embeddings.shape[1] != self.dim:
+                raise ValueError(
+                    f"Embedding dimension {embeddings.shape[1]} does not match store ({self.dim})"
+                )
+
+            with self._file_lock() as vectors_file:
+                # Another process may have appended since the last refresh
+                self._read_index()
+                new_keys = []
+                new_rows = []
+                for text, vector in zip(texts, embeddings):
+                    key = text_key(text)
+                    if key in self.index or key in new_keys:
+                        continue
+                    new_keys.append(key)
+                    new_rows.append(vector)
+                if not new_rows:
+                    return
+
+                first_row = os.fstat(vectors_file.fileno()).st_size // (self.dim * 4)
+                # Vectors are flushed before the index so the index never
+                # points at data that is not on disk yet.
+                np.stack(new_rows).astype(np.float32).tofile(vectors_file)
+                vectors_file.flush()
+                os.fsync(vectors_file.fileno())
+                with open(self.index_path, "a") as f:
+                    for offset, key in enumerate(new_keys):
+                        f.write(json.dumps({"key": key, "row": first_row + offset}) + "\n")
+                self._read_index()
+
+    def stats(self):
+        return {"model": self.model, "vectors": len(self.index), "dim": self.dim}
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(model=EMBEDDING_MODEL):
+    with _stores_lock:
+        if model not in _stores:
+            _stores[model] = EmbeddingStore(model)
+        return _stores[model]
+
+
+def embed_texts(texts, model=EMBEDDING_MODEL):
+    """
+    Returns an (n, dim) float32 matrix of embeddings for texts, only sending
+    the texts that are not already in the store to the embeddings endpoint.
+    The rows are copied out of the memmap, so the matrix is independent of it.
+    """
+    store = get_embedding_store(model)
+    vectors, missing = store.lookup(texts)
+
+    if missing:
+        # Duplicate lines only need to be embedded once
+        unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+        llm_response = text_embedding_llm(unique_texts, model=model)
+        embeddings = [
+            item["embedding"]
+            for item in sorted(llm_response["data"], key=lambda item: item["index"])
+        ]
+        store.add(unique_texts, embeddings)
+        vectors, missing = store.lookup(texts)
+        if missing:
+            raise ValueError("Embeddings endpoint did not return every input")
+
+    return np.stack(vectors)
@@ -5,28 +5,25 @@ from dateutil.parser import parse
 from utils import (
     read_file,
     llm_text_extraction,
+    extract_text,
     extract_text_from_csv,
-    extract_text_from_json,
-    extract_text_from_word,
-    extract_text_from_excel,
-    llm_process_image,
-    text_embedding_llm,
     httpx,
+    run_async,
 )
-from PIL import Image
 import glob
 import json
 import re
-import markdown2  # type: ignore
-from bs4 import BeautifulSoup  # type: ignore
-import base64
-import numpy as np
 import sqlite3
-import duckdb  # type: ignore
 import csv
 import io
 import mimetypes
 import sys
+from typing import List, Dict, Optional, TYPE_CHECKING
+
+# Heavy dependencies (PIL, numpy, duckdb, vosk, markdown2, bs4) are imported
+# inside the tools that use them to keep worker start-up fast.
+if TYPE_CHECKING:
+    from fastapi import FastAPI
 
 # A-1
 def online_script_runner(url, email, package):
@@ -126,43 +123,30 @@ def validate_data_paths(*paths):
 
 
 # A-3
-def count_dates(input_file, output_file, date_part, value_to_count):
+def count_dates(input_file, output_file, date_part, value_to_count, column=None):
     input_file, output_file = validate_data_paths(input_file, output_file)
     try:
-        file_extension = os.path.splitext(input_file)[1][1:]
-        if file_extension == "csv":
-            dates = extract_text_from_csv(input_file)
-        elif file_extension == "json":
-            dates = extract_text_from_json(input_file)
-        elif file_extension == "docx":
-            dates = extract_text_from_word(input_file)
-        elif file_extension == "xlsx" or file_extension == "xls":
-            dates = extract_text_from_excel(input_file)
-        else:
-            with open(input_file, "r") as f:
-                dates = f.readlines()
+        from dates import (
+            file_histograms,
+            count_from_histograms,
+            read_date_column,
+            TABULAR_EXTENSIONS,
+        )
 
-        count = 0
-        for date_str in dates:
-            date_str = date_str.strip()
-            try:
-                date_obj = parse(date_str)
+        tabular = os.path.splitext(input_file)[1].lower() in TABULAR_EXTENSIONS
 
-            except ValueError:
-                continue
-
-            if date_part == "weekday":
-                if date_obj.strftime("%A").lower() == value_to_count.lower():
-                    count += 1
-            elif date_part == "date":
-                if date_obj.strftime("%Y-%m-%d") == value_to_count:
-                    count += 1
-            elif date_part == "month":
-                if date_obj.strftime("%B").lower() == value_to_count.lower():
-                    count += 1
-            else:
-                raise ValueError(f"Invalid date_part: {date_part}")
+        def load_chunks():
+            if tabular:
+                # Only the date column is read, not every joined row
+                values = read_date_column(input_file, column)
+                if values is not None:
+                    return [values]
+            # Chunks keep memory flat however large the file is
+            return extract_text(input_file, column=None if tabular else column)
 
+        # Repeat counts on an unchanged file reuse the first pass's histograms
+        histograms = file_histograms(input_file, load_chunks, variant=column)
+        count = count_from_histograms(histograms, date_part, value_to_count)
         write_file(output_file, str(count))
 
     except FileNotFoundError:
@@ -172,35 +156,15 @@ def count_dates(input_file, output_file, date_part, value_to_count):
 
 
 # A-4
-def sort_contacts(input_file, output_file, sort_fields, sort_direction):
-    input_file, output_file = validate_data_paths(input_file, output_file)
+def sort_contacts(input_file, output_file, sort_fields, sort_direction, null_order=None):
+    from sorting import SortCriteria, sort_json_array
 
-    if len(sort_fields) != len(sort_direction):
-        raise ValueError("sort_fields and sort_direction must have the same length")
+    input_file, output_file = validate_data_paths(input_file, output_file)
+    criteria = SortCriteria(sort_fields, sort_direction, null_order)
 
     try:
-        with open(input_file, "r") as f:
-            contacts = json.load(f)
-
-        if not isinstance(contacts, list):
-            raise ValueError("Input file is not a valid JSON array")
-
-        sort_criteria = []
-        for field, direction in zip(sort_fields, sort_direction):
-            reverse = direction.lower() == "desc"
-            sort_criteria.append((field, reverse))
-
-        def multi_sort(contact):
-            return tuple(contact.get(field) for field, _ in sort_criteria)
-
-        contacts.sort(key=multi_sort, reverse=False)
-
-        for i, (field, reverse) in enumerate(sort_criteria):
-            if reverse:
-                contacts = sorted(
-                    contacts, key=lambda k: k.get(field, None), reverse=True
-                )
-        write_file(output_file, json.dumps(contacts))
+        # One comparison pass over all fields; large files are merge-sorted on disk
+        sort_json_array(input_file, output_file, criteria)
 
     except FileNotFoundError:
         raise FileNotFoundError(f"File not found: {input_file}")
@@ -372,6 +336,9 @@ def extract_markdown_headers(
     md_directory, header_level, header_occurrence, output_file, n_value=None
 ):
 
+    import markdown2  # type: ignore
+    from bs4 import BeautifulSoup  # type: ignore
+
     md_directory, output_file = validate_data_paths(md_directory, output_file)
 
     try:
@@ -422,23 +389,9 @@ def extract_information(input_file, output_file, extraction_instruction):
     input_file, output_file = validate_data_paths(input_file, output_file)
 
     try:
-
-        file_extension = os.path.splitext(input_file)[1][1:]
-        if file_extension == "csv":
-            content = extract_text_from_csv(
-                input_file, output_file, extraction_instruction
-            )
-        elif file_extension == "json":
-            content = extract_text_from_json(
-                input_file, output_file, extraction_instruction
-            )
-        elif file_extension == "docx":
-            content = extract_text_from_word(
-                input_file, output_file, extraction_instruction
-            )
-        else:
-            with open(input_file, "r") as f:
-                content = f.read()
+        content = "\n".join(
+            item for chunk in extract_text(input_file) for item in chunk
+        )
 
         try:
             llm_response = llm_text_extraction(extraction_instruction, content)
@@ -456,32 +409,13 @@ def extract_information(input_file, output_file, extraction_instruction):
 
 # A-8
 def process_image(image_path, output_file, processing_instruction):
+    from vision import extract_from_image
 
     image_path, output_file = validate_data_paths(image_path, output_file)
 
     try:
-        with open(image_path, "rb") as image_file:
-            encoded_string = base64.b64encode(image_file.read()).decode("utf-8")
-
-        general_instruction = f"Extract all readable text and numbers from this image.Provide the extracted content in a structured format."
-
         try:
-            image_extension = os.path.splitext(image_path)[1][1:]
-            image_llm_response = llm_process_image(
-                encoded_string, image_extension, general_instruction
-            )
-
-            extracted_data = image_llm_response["choices"][0]["message"]["content"]
-
-            text_llm_response = llm_text_extraction(
-                processing_instruction, extracted_data
-            )
-
-            extract_data = json.loads(
-                text_llm_response["choices"][0]["message"]["tool_calls"][0]["function"][
-                    "arguments"
-                ]
-            )["extracted_information"]
+            extract_data = extract_from_image(image_path, processing_instruction)
             write_file(output_file, " ".join(extract_data))
         except Exception as e:
             raise Exception(f"Error calling llm: {e}")
@@ -489,11 +423,32 @@ def process_image(image_path, output_file, processing_instruction):
         raise ValueError(f"Error processing image: {e}")
 
 
+def extract_from_images(image_pattern, output_file, processing_instruction):
+    from images import find_images
+    from vision import aextract_from_images
+
+    image_pattern, output_file = validate_data_paths(image_pattern, output_file)
+    image_paths = find_images(image_pattern)
+    if not image_paths:
+        raise ValueError(f"No images found for: {image_pattern}")
+
+    try:
+        succeeded, failed = run_async(
+            aextract_from_images(image_paths, processing_instruction, output_file)
+        )
+        return f"{succeeded} of {succeeded + failed} images processed"
+    except Exception as e:
+        raise ValueError(f"Error processing images: {e}")
+
+
 # A-9
 def find_texts_with_embeddings(
     input_file, output_file, find_type, input_format, output_format
 ):
 
+    import numpy as np
+    from embedding_store import embed_texts
+
     input_file, output_file = validate_data_paths(input_file, output_file)
 
     try:
@@ -509,10 +464,7 @@ def find_texts_with_embeddings(
         if len(texts) < 2:
             raise ValueError("Need at least two texts in the input file.")
 
-        llm_response = text_embedding_llm(texts)
-        embeddings = np.array(
-            [np.array(embedding["embedding"]) for embedding in llm_response["data"]]
-        )
+        embeddings = embed_texts(texts)
 
         norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
         normalized_embeddings = embeddings / norms
@@ -571,6 +523,8 @@ def sqlite_query(input_file, query):
 
 
 def duckdb_query(input_file, query):
+    import duckdb  # type: ignore
+
     try:
         conn = duckdb.connect(input_file)
         cursor = conn.cursor()
@@ -670,15 +624,14 @@ def clone_git_repo(repo_url, output_path):
         raise ValueError(f"Error cloning git repository: {e}")
 
 
-from typing import List, Dict, Optional
-
-
 def scrape_website(
     url: str,
     output_path: str,
     scrape_target: List[Dict[str, str]],
     filename: Optional[str] = None,
 ):
+    from bs4 import BeautifulSoup  # type: ignore
+
     output_path = output_path.strip("/")
 
     if not output_path.startswith("data"):
@@ -733,87 +686,120 @@ def scrape_website(
         raise ValueError(f"Error scraping website: {e}")
 
 
-def compress_image(image_path, output_file, quality):
-    output_file = output_file.strip("/")
-
-    if not output_file.startswith("data"):
-        raise ValueError("Output file must be in the data directory.")
+def compress_image(image_path, output_file, quality, keep_exif=False):
+    from images import transform
 
+    image_path, output_file = validate_data_paths(image_path, output_file)
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
     try:
-        if image.mode in ("RGBA", "P"):
-            image = image.convert("RGB")
-        image.save(output_file, format=image.format, optimize=True, quality=quality)
+        return transform("compress", image_path, output_file, keep_exif, quality=quality)
     except Exception as e:
         raise ValueError(f"Image compression failed: {e}")
 
 
-def resize_image(image_path, output_file, width, height):
-    output_file = output_file.strip("/")
-
-    if not output_file.startswith("data"):
-        raise ValueError("Output file must be in the data directory.")
+def resize_image(image_path, output_file, width, height, keep_exif=False):
+    from images import transform
 
+    image_path, output_file = validate_data_paths(image_path, output_file)
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
+
     try:
-        image = Image.open(image_path)
-        image = image.resize((width, height), Image.ANTIALIAS)  # Ensures better quality
-        image.save(output_file, format=image.format)  # Preserves format
-        return output_file
+        return transform(
+            "resize", image_path, output_file, keep_exif, width=width, height=height
+        )
     except Exception as e:
         raise ValueError(f"Image resizing failed: {e}")
 
 
-import wave
-from vosk import Model, KaldiRecognizer  # type: ignore
+def batch_process_images(
+    image_pattern,
+    output_directory,
+    operation,
+    quality=None,
+    width=None,
+    height=None,
+    keep_exif=False,
+):
+    from images import batch_process
+
+    image_pattern, output_directory = validate_data_paths(
+        image_pattern, output_directory
+    )
+
+    if operation == "compress":
+        if quality is None:
+            raise ValueError("quality is required for operation 'compress'")
+        params = {"quality": int(quality)}
+    elif operation == "resize":
+        if width is None or height is None:
+            raise ValueError("width and height are required for operation 'resize'")
+        params = {"width": int(width), "height": int(height)}
+    else:
+        raise ValueError(f"Invalid operation: {operation}")
+
+    os.makedirs(output_directory, exist_ok=True)
+    try:
+        batch_process(image_pattern, output_directory, operation, params, keep_exif=keep_exif)
+        return os.path.join(output_directory, "manifest.json")
+    except Exception as e:
+        raise ValueError(f"Batch image processing failed: {e}")
 
 
-def transcribe_audio(audio_path, output_file, model_path="model"):
-    output_file = output_file.strip("/")
+from audio import (
+    model_pool,
+    transcribe_wav_parallel,
+    wav_duration,
+    is_vosk_ready_wav,
+    open_pcm16_stream,
+    VOSK_MODEL_PATH,
+    AUDIO_PARALLEL_MIN_SECONDS,
+)
 
-    if not output_file.startswith("data"):
+
+def transcribe_audio(audio_path, output_path, model_path=VOSK_MODEL_PATH, parallel=None):
+    output_path = output_path.strip("/")
+
+    if not output_path.startswith("data"):
         raise ValueError("Output file must be in the data directory.")
 
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-    # Ensure model exists
     if not os.path.exists(model_path):
         raise FileNotFoundError(
             f"Vosk model not found at '{model_path}'. Download from: https://alphacephei.com/vosk/models"
         )
 
     try:
-        model = Model(model_path)
-        with wave.open(audio_path, "rb") as wf:
-            if (
-                wf.getnchannels() != 1
-                or wf.getsampwidth() != 2
-                or wf.getcomptype() != "NONE"
-            ):
-                raise ValueError(
-                    "Audio file must be WAV format with 16-bit PCM encoding."
-                )
-
-            rec = KaldiRecognizer(model, wf.getframerate())
-            transcript = ""
-
-            while True:
-                data = wf.readframes(4000)
-                if len(data) == 0:
-                    break
+        # Long recordings are split into segments and decoded across cores
+        if parallel is None:
+            parallel = (
+                is_vosk_ready_wav(audio_path)
+                and wav_duration(audio_path) >= AUDIO_PARALLEL_MIN_SECONDS
+            )
+        if parallel:
+            write_file(output_path, transcribe_wav_parallel(audio_path, model_path))
+            return output_path
+
+        # Other formats, channel counts and rates are converted while reading
+        sample_rate, chunks = open_pcm16_stream(audio_path)
+        transcript = []
+        with model_pool.recognizer(model_path, sample_rate) as rec:
+            for data in chunks:
                 if rec.AcceptWaveform(data):
-                    result = json.loads(rec.Result())
-                    transcript += result.get("text", "") + " "
+                    transcript.append(json.loads(rec.Result()).get("text", ""))
+            transcript.append(json.loads(rec.FinalResult()).get("text", ""))
 
-        write_file(output_file, transcript.strip())
-        return output_file
+        write_file(output_path, " ".join(text for text in transcript if text))
+        return output_path
 
     except Exception as e:
         raise ValueError(f"Audio transcription failed: {e}")
 
 
 def convert_markdown_to_html(markdown_path, output_file):
+    import markdown2  # type: ignore
+
     output_file = output_file.strip("/")
 
     if not output_file.startswith("data"):
@@ -832,11 +818,8 @@ def convert_markdown_to_html(markdown_path, output_file):
         raise Exception(f"Markdown to HTML conversion failed: {e}")
 
 
-from fastapi import FastAPI
-
-
 def filter_csv_to_json_api(
-    app: FastAPI,
+    app: "FastAPI",
     csv_path: str,
     filter_column: str,
     filter_value: str,
@@ -871,6 +854,43 @@ def filter_csv_to_json_api(
         raise Exception(f"CSV filtering failed: {e}")
 
 
+def code_namespace():
+    """
+    Globals for generated code: this module's names plus the libraries that
+    used to be imported at its top, which generated code still relies on.
+    The libraries are only imported here, when code is actually run.
+    """
+    import base64
+    import numpy as np
+    import duckdb  # type: ignore
+    import markdown2  # type: ignore
+    from PIL import Image
+    from bs4 import BeautifulSoup  # type: ignore
+    from utils import (
+        extract_text_from_json,
+        extract_text_from_word,
+        extract_text_from_excel,
+        llm_process_image,
+        text_embedding_llm,
+    )
+
+    namespace = dict(globals())
+    namespace.update(
+        base64=base64,
+        np=np,
+        duckdb=duckdb,
+        markdown2=markdown2,
+        Image=Image,
+        BeautifulSoup=BeautifulSoup,
+        extract_text_from_json=extract_text_from_json,
+        extract_text_from_word=extract_text_from_word,
+        extract_text_from_excel=extract_text_from_excel,
+        llm_process_image=llm_process_image,
+        text_embedding_llm=text_embedding_llm,
+    )
+    return namespace
+
+
 def write_code_and_run(generated_code, dependencies):
     print("write_code_and_run")
     if not dependencies and not generated_code:
@@ -879,6 +899,6 @@ def write_code_and_run(generated_code, dependencies):
         if dependencies:
             subprocess.run([sys.executable, "-m", "pip", "install", *dependencies], check=True)
 
-        exec(generated_code, globals())
+        exec(generated_code, code_namespace())
     except Exception as e:
         raise ValueError(f"Code execution failed: {e}")
\ No newline at end of file
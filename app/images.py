@@ -0,0 +1,346 @@
+import os
+import glob
+import json
+import time
+import shutil
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from utils import CACHE_DIR
+
+IMAGE_WORKERS = int(os.environ.get("IMAGE_WORKERS", str(os.cpu_count() or 1)))
+IMAGE_CACHE_ENABLED = os.environ.get("IMAGE_CACHE_ENABLED", "1") == "1"
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+IMAGE_CACHE_DIR = os.path.join(CACHE_DIR, "derivatives")
+# Pre-encode stage for vision calls. The provider scales "high" detail images
+# to fit 2048x2048 and then to 768px on the short side, so larger uploads
+# only cost bandwidth.
+VISION_PREENCODE = os.environ.get("VISION_PREENCODE", "1") == "1"
+VISION_MAX_SIDE = int(os.environ.get("VISION_MAX_SIDE", "2048"))
+VISION_SHORT_SIDE = int(os.environ.get("VISION_SHORT_SIDE", "768"))
+VISION_FORMAT = os.environ.get("VISION_FORMAT", "jpeg")
+VISION_QUALITY = int(os.environ.get("VISION_QUALITY", "85"))
+VISION_GRAYSCALE = os.environ.get("VISION_GRAYSCALE", "0") == "1"
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tif", ".tiff", ".gif"}
+# Formats that cannot store an alpha channel or palette
+RGB_ONLY_FORMATS = {"JPEG"}
+
+
+def output_format(output_file, image):
+    from PIL import Image
+
+    extension = os.path.splitext(output_file)[1].lower()
+    return Image.registered_extensions().get(extension) or image.format or "PNG"
+
+
+def _save(image, output_file, fmt, keep_exif, exif, **options):
+    if fmt in RGB_ONLY_FORMATS and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    if keep_exif and exif:
+        options["exif"] = exif
+    image.save(output_file, format=fmt, **options)
+
+
+def compress_file(image_path, output_file, quality, keep_exif=False):
+    from PIL import Image
+
+    with Image.open(image_path) as image:
+        fmt = output_format(output_file, image)
+        exif = image.info.get("exif")
+        _save(image, output_file, fmt, keep_exif, exif, optimize=True, quality=quality)
+    return output_file
+
+
+def resize_file(image_path, output_file, width, height, keep_exif=False):
+    from PIL import Image
+
+    with Image.open(image_path) as image:
+        fmt = output_format(output_file, image)
+        exif = image.info.get("exif")
+        # For JPEGs the decoder itself downscales by a power of two when the
+        # target is much smaller, skipping most of the IDCT work.
+        if image.format == "JPEG":
+            image.draft("RGB", (width, height))
+        # reducing_gap lets Pillow use the cheap integer reduce() first
+        resized = image.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        _save(resized, output_file, fmt, keep_exif, exif)
+    return output_file
+
+
+OPERATIONS = {
+    "compress": compress_file,
+    "resize": resize_file,
+}
+
+
+def vision_scale(width, height, max_side=VISION_MAX_SIDE, short_side=VISION_SHORT_SIDE):
+    return min(1.0, max_side / max(width, height), short_side / min(width, height))
+
+
+def prepare_vision_image(
+    image_path,
+    max_side=VISION_MAX_SIDE,
+    short_side=VISION_SHORT_SIDE,
+    fmt=VISION_FORMAT,
+    quality=VISION_QUALITY,
+    grayscale=VISION_GRAYSCALE,
+    crop=None,
+):
+    """
+    Shrinks an image to what the vision model actually looks at and
+    re-encodes it. crop is an optional (left, top, right, bottom) box in
+    source pixels. Returns (base64_string, extension, info).
+    """
+    import io
+    import base64
+    from PIL import Image
+
+    start = time.perf_counter()
+    source_bytes = os.path.getsize(image_path)
+    with Image.open(image_path) as image:
+        if crop:
+            image = image.crop(tuple(crop))
+        scale = vision_scale(image.width, image.height, max_side, short_side)
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        if image.format == "JPEG":
+            image.draft("RGB", size)
+        if image.mode in ("RGBA", "LA", "P"):
+            # Flatten transparency onto white so text stays readable
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        image = image.convert("L" if grayscale else "RGB")
+        if image.size != size:
+            image = image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+
+        buffer = io.BytesIO()
+        fmt = fmt.lower()
+        if fmt in ("jpeg", "jpg"):
+            image.save(buffer, format="JPEG", quality=quality, optimize=True)
+            extension = "jpeg"
+        elif fmt == "webp":
+            image.save(buffer, format="WEBP", quality=quality)
+            extension = "webp"
+        else:
+            image.save(buffer, format="PNG", optimize=True)
+            extension = "png"
+
+    encoded = buffer.getvalue()
+    info = {
+        "source_bytes": source_bytes,
+        "encoded_bytes": len(encoded),
+        "size": size,
+        "seconds": time.perf_counter() - start,
+    }
+    return base64.b64encode(encoded).decode("utf-8"), extension, info
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _copy_out(source, destination):
+    # Outputs are independent copies: a hardlink would let any later write
+    # to one output change the cache entry and every other output. An old
+    # destination is removed first in case it is still such a link.
+    if os.path.lexists(destination):
+        os.remove(destination)
+    shutil.copyfile(source, destination)
+
+
+class DerivativeCache:
+    """
+    Size-bounded LRU cache of transformed images keyed on the source's
+    content hash, the operation and its parameters. Hits are served as a
+    copy of the cached file; recency is tracked with mtime.
+    """
+
+    def __init__(self, directory=IMAGE_CACHE_DIR, max_bytes=IMAGE_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.total_bytes = None
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+
+    def key(self, image_path, operation, params, output_extension, keep_exif):
+        description = json.dumps(
+            [file_sha256(image_path), operation, params, output_extension, keep_exif],
+            sort_keys=True,
+        )
+        return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+    def _path(self, key, output_extension):
+        return os.path.join(self.directory, key[:2], key + output_extension)
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if ".tmp" not in name:
+                    yield os.path.join(root, name)
+
+    def _scan(self):
+        if self.total_bytes is None:
+            self.total_bytes = sum(os.path.getsize(path) for path in self._entries())
+
+    def _evict(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+        entries = sorted(self._entries(), key=os.path.getmtime)
+        for path in entries:
+            if self.total_bytes <= self.max_bytes:
+                break
+            size = os.path.getsize(path)
+            os.remove(path)
+            self.total_bytes -= size
+            self.evictions += 1
+
+    def transform(self, operation, image_path, output_file, keep_exif=False, **params):
+        """Writes the derivative to output_file, reusing a cached one if present."""
+        output_extension = os.path.splitext(output_file)[1].lower()
+        key = self.key(image_path, operation, params, output_extension, keep_exif)
+        cached = self._path(key, output_extension)
+
+        with self.lock:
+            self._scan()
+            if os.path.exists(cached):
+                os.utime(cached)
+                _copy_out(cached, output_file)
+                self.hits += 1
+                self.bytes_saved += os.path.getsize(cached)
+                return output_file
+
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        temporary = f"{cached}.{os.getpid()}.{threading.get_ident()}.tmp"
+        # The temporary name keeps the real extension for format detection
+        temporary_output = temporary + output_extension
+        try:
+            OPERATIONS[operation](image_path, temporary_output, keep_exif=keep_exif, **params)
+            os.replace(temporary_output, cached)
+        finally:
+            if os.path.exists(temporary_output):
+                os.remove(temporary_output)
+
+        with self.lock:
+            self.misses += 1
+            self.total_bytes += os.path.getsize(cached)
+            _copy_out(cached, output_file)
+            self._evict()
+        return output_file
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "cached_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
+
+
+derivative_cache = DerivativeCache()
+
+
+def transform(operation, image_path, output_file, keep_exif=False, **params):
+    if IMAGE_CACHE_ENABLED:
+        return derivative_cache.transform(
+            operation, image_path, output_file, keep_exif, **params
+        )
+    return OPERATIONS[operation](image_path, output_file, keep_exif=keep_exif, **params)
+
+
+def _process_one(operation, image_path, output_file, params, keep_exif):
+    start = time.perf_counter()
+    entry = {"source": image_path, "output": output_file}
+    try:
+        OPERATIONS[operation](image_path, output_file, keep_exif=keep_exif, **params)
+        entry["source_bytes"] = os.path.getsize(image_path)
+        entry["output_bytes"] = os.path.getsize(output_file)
+    except Exception as e:
+        entry["error"] = str(e)
+    entry["seconds"] = round(time.perf_counter() - start, 4)
+    return entry
+
+
+def find_images(pattern):
+    """Image files matching a glob pattern, or every image in a directory."""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "**", "*")
+    # glob skips dot-directories such as data/.cache unless named explicitly
+    return sorted(
+        path
+        for path in glob.glob(pattern, recursive=True)
+        if os.path.isfile(path) and os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+    )
+
+
+def batch_process(
+    pattern, output_dir, operation, params, workers=IMAGE_WORKERS, keep_exif=False
+):
+    """
+    Applies operation to every image matched by pattern on a process pool,
+    writing outputs under output_dir with the same relative names. Returns
+    the manifest, which is also written to output_dir/manifest.json.
+    """
+    if operation not in OPERATIONS:
+        raise ValueError(f"Invalid operation: {operation}")
+
+    images = find_images(pattern)
+    if not images:
+        raise FileNotFoundError(f"No images found for: {pattern}")
+
+    base = os.path.commonpath([os.path.dirname(path) for path in images])
+    sources = {os.path.realpath(path) for path in images}
+    jobs = []
+    for image_path in images:
+        output_file = os.path.join(output_dir, os.path.relpath(image_path, base))
+        # Writing into the source directory would overwrite the originals
+        if os.path.realpath(output_file) in sources:
+            raise ValueError(f"Output directory {output_dir} would overwrite the source images")
+        jobs.append((image_path, output_file))
+    for _, output_file in jobs:
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        entries = list(
+            executor.map(
+                _process_one,
+                [operation] * len(jobs),
+                [source for source, _ in jobs],
+                [output for _, output in jobs],
+                [params] * len(jobs),
+                [keep_exif] * len(jobs),
+                chunksize=max(1, len(jobs) // (workers * 4)),
+            )
+        )
+    elapsed = time.perf_counter() - start
+
+    succeeded = [entry for entry in entries if "error" not in entry]
+    manifest = {
+        "operation": operation,
+        "params": params,
+        "workers": workers,
+        "images": len(entries),
+        "failed": len(entries) - len(succeeded),
+        "source_bytes": sum(entry["source_bytes"] for entry in succeeded),
+        "output_bytes": sum(entry["output_bytes"] for entry in succeeded),
+        "seconds": round(elapsed, 3),
+        "images_per_second": round(len(entries) / elapsed, 2) if elapsed else None,
+        "files": entries,
+    }
+    with open(os.path.join(output_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
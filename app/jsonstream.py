@@ -0,0 +1,278 @@
+"""
+Incremental JSON parser that reads a file in chunks and never holds more
+than the current token and the path to it.
+
+    events(f)            -> (path, event, value) for every token
+    leaves(f, pointer)   -> (path, value) for scalars under pointer
+    items(f, pointer)    -> each subtree matching pointer, materialised
+
+Paths are tuples of object keys and array indexes. Pointers use JSON
+pointer syntax ("/contacts/0/email") with "*" matching any key or index.
+"""
+
+import re
+import json
+from json.decoder import scanstring
+
+JSONSTREAM_READ_BYTES = 1024 * 1024
+# Containers this shallow that fit in the buffer are decoded by the C
+# decoder in one go; deeper or larger ones are tokenized.
+JSONSTREAM_FAST_DEPTH = 64
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?")
+LITERALS = {"true": True, "false": False, "null": None}
+
+# Parser states
+VALUE, KEY_OR_END, KEY, COLON, VALUE_OR_END, COMMA_OR_END = range(6)
+
+
+class JSONStreamError(ValueError):
+    pass
+
+
+_decoder = json.JSONDecoder()
+
+
+def parse_pointer(pointer):
+    """'/a/*/b' -> ['a', '*', 'b']; '' or '/' selects the whole document."""
+    if not pointer or pointer == "/":
+        return []
+    if not pointer.startswith("/"):
+        raise JSONStreamError(f"Invalid JSON pointer: {pointer}")
+    return [part.replace("~1", "/").replace("~0", "~") for part in pointer[1:].split("/")]
+
+
+def path_matches(path, parts, exact=False):
+    if len(path) < len(parts) or (exact and len(path) != len(parts)):
+        return False
+    for step, part in zip(path, parts):
+        if part != "*" and str(step) != part:
+            return False
+    return True
+
+
+def _walk(root, path):
+    """The events for an already decoded container, without recursion."""
+    path = list(path)
+    yield tuple(path), "start_map" if isinstance(root, dict) else "start_array", None
+    stack = [(isinstance(root, dict), iter(root.items() if isinstance(root, dict) else enumerate(root)))]
+    path.append(None)
+    while stack:
+        is_map, children = stack[-1]
+        for key, child in children:
+            path[-1] = key
+            if isinstance(child, dict):
+                yield tuple(path), "start_map", None
+                stack.append((True, iter(child.items())))
+                path.append(None)
+                break
+            if isinstance(child, list):
+                yield tuple(path), "start_array", None
+                stack.append((False, iter(enumerate(child))))
+                path.append(None)
+                break
+            yield tuple(path), "value", child
+        else:
+            stack.pop()
+            path.pop()
+            yield tuple(path), "end_map" if is_map else "end_array", None
+
+
+def events(f, read_bytes=JSONSTREAM_READ_BYTES):
+    """
+    Yields (path, event, value) with event one of start_map, end_map,
+    start_array, end_array or value. Nesting is tracked on an explicit
+    stack, so depth is only limited by memory.
+    """
+    buffer = ""
+    position = 0
+    eof = False
+    path = []
+    # One entry per open container: True for objects, False for arrays
+    containers = []
+    state = VALUE
+
+    def fill():
+        nonlocal buffer, position, eof
+        chunk = f.read(read_bytes)
+        if not chunk:
+            eof = True
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    def value_done():
+        # What follows a complete value depends on the enclosing container
+        return COMMA_OR_END if containers else None
+
+    while True:
+        position = WHITESPACE.match(buffer, position).end()
+        if position >= len(buffer):
+            if eof:
+                if state is None:
+                    return
+                raise JSONStreamError("Unexpected end of JSON input")
+            fill()
+            continue
+
+        char = buffer[position]
+        if state is None:
+            raise JSONStreamError(f"Extra data at position {position}: {char!r}")
+
+        if state == COLON:
+            if char != ":":
+                raise JSONStreamError(f"Expected ':' but found {char!r}")
+            position += 1
+            state = VALUE
+            continue
+
+        if state == COMMA_OR_END:
+            if char == ",":
+                position += 1
+                if containers[-1]:
+                    state = KEY
+                else:
+                    path[-1] += 1
+                    state = VALUE
+                continue
+            if char == ("}" if containers[-1] else "]"):
+                position += 1
+                is_map = containers.pop()
+                path.pop()
+                yield tuple(path), "end_map" if is_map else "end_array", None
+                state = value_done()
+                continue
+            raise JSONStreamError(f"Expected ',' or closing bracket but found {char!r}")
+
+        if state in (KEY_OR_END, KEY):
+            if char == "}" and state == KEY_OR_END:
+                position += 1
+                containers.pop()
+                path.pop()
+                yield tuple(path), "end_map", None
+                state = value_done()
+                continue
+            if char != '"':
+                raise JSONStreamError(f"Expected object key but found {char!r}")
+            try:
+                key, end = scanstring(buffer, position + 1)
+            except json.JSONDecodeError:
+                if eof:
+                    raise JSONStreamError("Unterminated object key")
+                fill()
+                continue
+            position = end
+            path[-1] = key
+            state = COLON
+            continue
+
+        # VALUE or VALUE_OR_END
+        if char == "]" and state == VALUE_OR_END:
+            position += 1
+            containers.pop()
+            path.pop()
+            yield tuple(path), "end_array", None
+            state = value_done()
+            continue
+
+        if char in "{[" and len(containers) < JSONSTREAM_FAST_DEPTH:
+            try:
+                value, end = _decoder.raw_decode(buffer, position)
+            except (json.JSONDecodeError, RecursionError):
+                # Runs past the buffer (or is malformed): tokenize it instead
+                value = end = None
+            if end is not None:
+                yield from _walk(value, path)
+                position = end
+                state = value_done()
+                continue
+
+        if char == "{":
+            position += 1
+            yield tuple(path), "start_map", None
+            containers.append(True)
+            path.append(None)
+            state = KEY_OR_END
+            continue
+
+        if char == "[":
+            position += 1
+            yield tuple(path), "start_array", None
+            containers.append(False)
+            path.append(0)
+            state = VALUE_OR_END
+            continue
+
+        if char == '"':
+            try:
+                value, end = scanstring(buffer, position + 1)
+            except json.JSONDecodeError:
+                if eof:
+                    raise JSONStreamError("Unterminated string")
+                fill()
+                continue
+        else:
+            match = NUMBER.match(buffer, position)
+            if match:
+                end = match.end()
+                # The number may continue in the next chunk ("1." + "5")
+                if not eof and (end == len(buffer) or buffer[end] in ".eE+-"):
+                    fill()
+                    continue
+                text = match.group()
+                value = float(text) if any(c in text for c in ".eE") else int(text)
+            else:
+                for literal, value in LITERALS.items():
+                    if buffer.startswith(literal, position):
+                        end = position + len(literal)
+                        break
+                else:
+                    if len(buffer) - position < 5 and not eof:
+                        fill()
+                        continue
+                    raise JSONStreamError(f"Unexpected character {char!r}")
+        position = end
+        yield tuple(path), "value", value
+        state = value_done()
+
+
+def leaves(f, pointer=None):
+    """Yields (path, value) for every scalar at or under pointer."""
+    parts = parse_pointer(pointer)
+    for path, event, value in events(f):
+        if event == "value" and (not parts or path_matches(path, parts)):
+            yield path, value
+
+
+def items(f, pointer=None):
+    """
+    Yields each value whose path matches pointer exactly, built without
+    recursion. Only one matching subtree is in memory at a time.
+    """
+    parts = parse_pointer(pointer)
+    # Open containers of the subtree being built
+    stack = []
+    for path, event, value in events(f):
+        if not stack:
+            if not path_matches(path, parts, exact=True):
+                continue
+            if event == "value":
+                yield value
+            elif event in ("start_map", "start_array"):
+                stack.append({} if event == "start_map" else [])
+            continue
+
+        if event in ("start_map", "start_array"):
+            stack.append({} if event == "start_map" else [])
+            continue
+        if event in ("end_map", "end_array"):
+            value = stack.pop()
+            if not stack:
+                yield value
+                continue
+
+        container = stack[-1]
+        if isinstance(container, dict):
+            container[path[-1]] = value
+        else:
+            container.append(value)
@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+from utils import CACHE_DIR
+
+PLAN_CACHE_ENABLED = os.environ.get("PLAN_CACHE_ENABLED", "1") == "1"
+PLAN_CACHE_TTL = float(os.environ.get("PLAN_CACHE_TTL", "3600"))
+PLAN_CACHE_SIZE = int(os.environ.get("PLAN_CACHE_SIZE", "512"))
+PLAN_CACHE_DB = os.path.join(CACHE_DIR, "plans.sqlite3")
+
+
+def normalize_task(task):
+    # Only whitespace is normalized; casing matters for file paths
+    return " ".join(task.split())
+
+
+class PlanCache:
+    """Two tier (memory LRU + SQLite) cache of the tool call chosen for a task."""
+
+    def __init__(self, db_path=PLAN_CACHE_DB, max_entries=PLAN_CACHE_SIZE, ttl=PLAN_CACHE_TTL):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._db_ready = False
+
+    def make_key(self, task, tools, model):
+        payload = json.dumps(
+            [normalize_task(task), tools, model], sort_keys=True, separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connect(self):
+        if not self._db_ready:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        if not self._db_ready:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS plans (
+                    key TEXT PRIMARY KEY,
+                    function_name TEXT NOT NULL,
+                    arguments TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )"""
+            )
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    def _remember(self, key, entry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, key):
+        """Returns (function_name, arguments) for a cached plan or None."""
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self.memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[1], json.loads(entry[2])
+                del self.memory[key]
+
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT function_name, arguments, expires_at FROM plans WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None and row[2] <= now:
+                    conn.execute("DELETE FROM plans WHERE key = ?", (key,))
+                    conn.commit()
+                    row = None
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Plan cache read failed: {e}")
+            row = None
+
+        with self.lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self._remember(key, (row[2], row[0], row[1]))
+            self.hits += 1
+            self.disk_hits += 1
+        return row[0], json.loads(row[1])
+
+    def put(self, key, function_name, arguments):
+        expires_at = time.time() + self.ttl
+        serialized = json.dumps(arguments, sort_keys=True)
+        with self.lock:
+            self._remember(key, (expires_at, function_name, serialized))
+
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?)",
+                    (key, function_name, serialized, expires_at),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Plan cache write failed: {e}")
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+        if os.path.exists(self.db_path):
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM plans")
+                conn.commit()
+            finally:
+                conn.close()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self.memory),
+            }
+
+
+plan_cache = PlanCache()
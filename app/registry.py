@@ -0,0 +1,141 @@
+import os
+import time
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+TOOL_THREAD_WORKERS = int(os.environ.get("TOOL_THREAD_WORKERS", "8"))
+# CPU-bound tools get their own, smaller pool so they cannot starve IO-bound
+# ones. Both pools are threads: the tools share this process's caches, stats
+# and loaded models, and their heavy parts release the GIL or use own pools.
+TOOL_CPU_WORKERS = int(os.environ.get("TOOL_CPU_WORKERS", str(os.cpu_count() or 1)))
+
+
+class _MessageArguments(dict):
+    # Messages may mention arguments the LLM left out
+    def __missing__(self, key):
+        return "None"
+
+
+class Tool:
+    def __init__(self, name, schema, target, message, kind):
+        if kind not in ("io", "cpu"):
+            raise ValueError(f"Invalid tool kind: {kind}")
+        self.name = name
+        self.schema = schema
+        self.target = target
+        self.message = message
+        self.kind = kind
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self._function = None
+
+    @property
+    def function(self):
+        """The tool's callable; its module is imported on first use."""
+        if self._function is None:
+            module_name, attribute = self.target.split(":")
+            self._function = getattr(importlib.import_module(module_name), attribute)
+        return self._function
+
+    def format_message(self, result, arguments):
+        return self.message.format_map(_MessageArguments(arguments, result=result))
+
+    def stats(self):
+        return {
+            "kind": self.kind,
+            "calls": self.calls,
+            "errors": self.errors,
+            "mean_seconds": self.total_time / self.calls if self.calls else 0.0,
+        }
+
+
+class ToolRegistry:
+    """Maps tool names to their schema, implementation and result message."""
+
+    def __init__(self):
+        self.tools = {}
+        self.timing_hooks = []
+        self.lock = threading.Lock()
+        self._io_pool = None
+        self._cpu_pool = None
+
+    def register(self, target, schema, message, kind="io"):
+        name = schema["function"]["name"]
+        if name in self.tools:
+            raise ValueError(f"Tool already registered: {name}")
+        self.tools[name] = Tool(name, schema, target, message, kind)
+
+    def get(self, name):
+        tool = self.tools.get(name)
+        if tool is None:
+            raise ValueError(f"Unknown function name: {name}")
+        return tool
+
+    def schemas(self):
+        return [tool.schema for tool in self.tools.values()]
+
+    def add_timing_hook(self, hook):
+        """hook(tool, elapsed_seconds, error) runs after every tool call."""
+        self.timing_hooks.append(hook)
+
+    def _record(self, tool, elapsed, error):
+        with self.lock:
+            tool.calls += 1
+            tool.total_time += elapsed
+            if error is not None:
+                tool.errors += 1
+        for hook in self.timing_hooks:
+            hook(tool, elapsed, error)
+
+    def executor_for(self, name):
+        """The thread pool for the tool's kind, created on first use."""
+        tool = self.get(name)
+        with self.lock:
+            if tool.kind == "cpu":
+                if self._cpu_pool is None:
+                    self._cpu_pool = ThreadPoolExecutor(
+                        max_workers=TOOL_CPU_WORKERS, thread_name_prefix="tool-cpu"
+                    )
+                return self._cpu_pool
+            if self._io_pool is None:
+                self._io_pool = ThreadPoolExecutor(
+                    max_workers=TOOL_THREAD_WORKERS, thread_name_prefix="tool-io"
+                )
+            return self._io_pool
+
+    def _run(self, tool, arguments):
+        start = time.perf_counter()
+        error = None
+        try:
+            return tool.function(**arguments)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._record(tool, time.perf_counter() - start, error)
+
+    def submit(self, name, arguments):
+        """Runs a tool on the pool matching its kind; the Future holds its raw result."""
+        tool = self.get(name)
+        return self.executor_for(name).submit(self._run, tool, arguments)
+
+    def execute(self, name, arguments):
+        """Runs a tool on its pool, waits for it and returns its result message."""
+        result = self.submit(name, arguments).result()
+        return self.get(name).format_message(result, arguments)
+
+    def stats(self):
+        with self.lock:
+            return {name: tool.stats() for name, tool in self.tools.items()}
+
+    def shutdown(self):
+        for pool in (self._io_pool, self._cpu_pool):
+            if pool is not None:
+                pool.shutdown(wait=False)
+        self._io_pool = None
+        self._cpu_pool = None
+
+
+registry = ToolRegistry()
@@ -0,0 +1,267 @@
+import os
+import re
+import threading
+
+ROUTER_ENABLED = os.environ.get("ROUTER_ENABLED", "1") == "1"
+ROUTER_CONFIDENCE = float(os.environ.get("ROUTER_CONFIDENCE", "0.8"))
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = [
+    "january", "february", "march", "april", "may", "june", "july",
+    "august", "september", "october", "november", "december",
+]
+
+PATH_PATTERN = re.compile(r"(/?data/[\w./-]*\w)")
+WEEKDAY_PATTERN = re.compile(r"\b(" + "|".join(WEEKDAYS) + r")s?\b", re.I)
+MONTH_PATTERN = re.compile(r"\b(" + "|".join(MONTHS) + r")\b", re.I)
+ISO_DATE_PATTERN = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+# Something saying the task is about a list of dates, not just mentioning a day
+DATE_CUE_PATTERN = re.compile(
+    r"\bdates?\b|\b(?:" + "|".join(WEEKDAYS) + r")s\b|\bhow many (?:" + "|".join(WEEKDAYS) + r")\b",
+    re.I,
+)
+# Lowercase "may" is usually the verb unless a day or year sits next to it
+DAY_BEFORE_PATTERN = re.compile(r"\b\d{1,2}(?:st|nd|rd|th)?\s+$")
+DAY_OR_YEAR_AFTER_PATTERN = re.compile(r"\s+\d{1,4}\b")
+SIZE_PATTERN = re.compile(r"\b(\d+)\s*(?:x|by|\*)\s*(\d+)\b", re.I)
+QUALITY_PATTERN = re.compile(r"\bquality\s*(?:of|=|:|to)?\s*(\d{1,3})\b", re.I)
+SORT_BY_PATTERN = re.compile(
+    r"\bby\s+(.+?)(?:,?\s+(?:and\s+)?(?:write|save|store|output)\b|\s+(?:in)?to\s+/?data/|$)",
+    re.I,
+)
+
+# Phrasing that usually means the task is more than a plain template
+HEDGE_PATTERN = re.compile(
+    r"\b(except|unless|only if|but not|excluding|instead|also|code|script)\b", re.I
+)
+# Ranges and comparisons ("before 2024-01-01", "2024 or later") are not an
+# exact count of one weekday, month or date
+COMPARISON_PATTERN = re.compile(
+    r"\b(before|after|earlier|later|since|until|till|between|prior to|older|newer)\b"
+    r"|\bfrom\s+(?:\d|(?:" + "|".join(MONTHS) + r")\b)",
+    re.I,
+)
+
+
+def find_paths(task):
+    return [path.strip("/") for path in PATH_PATTERN.findall(task)]
+
+
+def _input_output(task, input_extensions=None):
+    paths = find_paths(task)
+    if len(paths) != 2:
+        return None, None
+    input_path, output_path = paths
+    if input_extensions and os.path.splitext(input_path)[1].lower() not in input_extensions:
+        return None, None
+    return input_path, output_path
+
+
+def find_month(task):
+    for match in MONTH_PATTERN.finditer(task):
+        if match.group(1) == "may" and not (
+            DAY_BEFORE_PATTERN.search(task, 0, match.start())
+            or DAY_OR_YEAR_AFTER_PATTERN.match(task, match.end())
+        ):
+            continue
+        return match
+    return None
+
+
+def extract_count_dates(task):
+    input_file, output_file = _input_output(task)
+    if not input_file:
+        return None
+
+    if not DATE_CUE_PATTERN.search(task) or COMPARISON_PATTERN.search(task):
+        return None
+
+    weekday = WEEKDAY_PATTERN.search(task)
+    month = find_month(task)
+    date = ISO_DATE_PATTERN.search(task)
+    found = [m for m in (weekday, month, date) if m]
+    if len(found) != 1:
+        return None
+
+    if weekday:
+        date_part, value = "weekday", weekday.group(1).capitalize()
+    elif month:
+        date_part, value = "month", month.group(1).capitalize()
+    else:
+        date_part, value = "date", date.group(1)
+    return {
+        "input_file": input_file,
+        "output_file": output_file,
+        "date_part": date_part,
+        "value_to_count": value,
+    }
+
+
+def extract_sort_contacts(task):
+    input_file, output_file = _input_output(task, {".json"})
+    if not input_file:
+        return None
+
+    match = SORT_BY_PATTERN.search(task)
+    if not match:
+        return None
+
+    sort_fields = []
+    sort_direction = []
+    for part in re.split(r",|\bthen\b|\band\b", match.group(1)):
+        words = part.split()
+        if not words:
+            continue
+        direction = "asc"
+        if words[-1].lower() in ("desc", "descending"):
+            direction = "desc"
+            words = words[:-1]
+        elif words[-1].lower() in ("asc", "ascending"):
+            words = words[:-1]
+        if len(words) != 1 or not re.fullmatch(r"[A-Za-z_][\w.]*", words[0]):
+            return None
+        sort_fields.append(words[0])
+        sort_direction.append(direction)
+
+    if not sort_fields:
+        return None
+    return {
+        "input_file": input_file,
+        "output_file": output_file,
+        "sort_fields": sort_fields,
+        "sort_direction": sort_direction,
+    }
+
+
+def extract_markdown_to_html(task):
+    markdown_path, output_file = _input_output(task, {".md", ".markdown"})
+    if not markdown_path:
+        return None
+    return {"markdown_path": markdown_path, "output_file": output_file}
+
+
+def extract_resize_image(task):
+    image_path, output_file = _input_output(task)
+    size = SIZE_PATTERN.search(task)
+    if not image_path or not size:
+        return None
+    return {
+        "image_path": image_path,
+        "output_file": output_file,
+        "width": int(size.group(1)),
+        "height": int(size.group(2)),
+    }
+
+
+def extract_compress_image(task):
+    image_path, output_file = _input_output(task)
+    quality = QUALITY_PATTERN.search(task)
+    if not image_path or not quality or int(quality.group(1)) > 100:
+        return None
+    return {
+        "image_path": image_path,
+        "output_file": output_file,
+        "quality": int(quality.group(1)),
+    }
+
+
+class Route:
+    def __init__(self, function_name, pattern, keywords, extract):
+        self.function_name = function_name
+        self.pattern = re.compile(pattern, re.I)
+        self.keywords = keywords
+        self.extract = extract
+
+    def score(self, task):
+        """Returns (arguments, confidence) or None if the template does not apply."""
+        if not self.pattern.search(task):
+            return None
+        arguments = self.extract(task)
+        if arguments is None:
+            return None
+
+        lowered = task.lower()
+        keyword_hits = sum(1 for keyword in self.keywords if keyword in lowered)
+        # Whole points out of 100, so 0.7 plus one of three keywords is exactly 0.8
+        points = 70 + 30 * keyword_hits // len(self.keywords)
+        if HEDGE_PATTERN.search(task):
+            points -= 30
+        return arguments, points / 100
+
+
+ROUTES = [
+    Route(
+        "count_dates",
+        r"\b(count|how many|number of)\b",
+        ["dates", "write", "per line"],
+        extract_count_dates,
+    ),
+    Route(
+        "sort_contacts",
+        r"\bsort\b.*\bby\b",
+        ["contacts", "json", "write"],
+        extract_sort_contacts,
+    ),
+    Route(
+        "convert_markdown_to_html",
+        r"\b(convert|render)\b.*\bhtml\b",
+        ["markdown", ".md", "write"],
+        extract_markdown_to_html,
+    ),
+    Route(
+        "resize_image",
+        r"\b(resize|scale)\b",
+        ["image", "pixels", "save"],
+        extract_resize_image,
+    ),
+    Route(
+        "compress_image",
+        r"\bcompress\b",
+        ["image", "quality", "save"],
+        extract_compress_image,
+    ),
+]
+
+
+class Router:
+    """Local template router that answers common tasks without the LLM."""
+
+    def __init__(self, routes=ROUTES, threshold=ROUTER_CONFIDENCE):
+        self.routes = routes
+        self.threshold = threshold
+        self.lock = threading.Lock()
+        self.routed = {}
+        self.fallen_through = 0
+
+    def route(self, task):
+        """Returns (function_name, arguments) for a confident match, else None."""
+        candidates = []
+        for route in self.routes:
+            scored = route.score(task)
+            if scored is not None:
+                candidates.append((scored[1], route.function_name, scored[0]))
+
+        # Two templates matching the same task is itself a sign of ambiguity
+        if len(candidates) == 1 and candidates[0][0] >= self.threshold:
+            _, function_name, arguments = candidates[0]
+            with self.lock:
+                self.routed[function_name] = self.routed.get(function_name, 0) + 1
+            return function_name, arguments
+
+        with self.lock:
+            self.fallen_through += 1
+        return None
+
+    def stats(self):
+        with self.lock:
+            routed = sum(self.routed.values())
+            total = routed + self.fallen_through
+            return {
+                "routed": routed,
+                "fallen_through": self.fallen_through,
+                "routed_rate": routed / total if total else 0.0,
+                "routed_by_tool": dict(self.routed),
+            }
+
+
+router = Router()
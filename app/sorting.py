@@ -0,0 +1,188 @@
+import os
+import json
+import heapq
+import tempfile
+from functools import cmp_to_key
+
+# Inputs whose decoded objects would take more than this are sorted in runs
+# on disk and merged. Decoded JSON objects take a few times their text size.
+SORT_MEMORY_BUDGET = int(os.environ.get("SORT_MEMORY_BUDGET", str(256 * 1024 * 1024)))
+SORT_MEMORY_FACTOR = float(os.environ.get("SORT_MEMORY_FACTOR", "4"))
+SORT_READ_BYTES = 1024 * 1024
+SORT_TEMP_DIR = os.environ.get("SORT_TEMP_DIR") or None
+
+
+class SortCriteria:
+    """Per-field direction and null placement, compared in a single pass."""
+
+    def __init__(self, fields, directions, null_order=None):
+        if len(fields) != len(directions):
+            raise ValueError("sort_fields and sort_direction must have the same length")
+        if null_order is None or isinstance(null_order, str):
+            null_order = [null_order or "last"] * len(fields)
+        if len(null_order) != len(fields):
+            raise ValueError("null_order must have the same length as sort_fields")
+
+        self.fields = []
+        for field, direction, nulls in zip(fields, directions, null_order):
+            direction = direction.lower()
+            nulls = nulls.lower()
+            if direction not in ("asc", "desc"):
+                raise ValueError(f"Invalid sort direction: {direction}")
+            if nulls not in ("first", "last"):
+                raise ValueError(f"Invalid null order: {nulls}")
+            # Nulls stay first or last whatever the field's direction
+            self.fields.append((field, -1 if direction == "desc" else 1, -1 if nulls == "first" else 1))
+        self.key = cmp_to_key(self.compare)
+
+    def compare(self, a, b):
+        for field, sign, null_sign in self.fields:
+            value_a = a.get(field) if isinstance(a, dict) else None
+            value_b = b.get(field) if isinstance(b, dict) else None
+            if value_a is None or value_b is None:
+                if value_a is None and value_b is None:
+                    continue
+                return null_sign if value_a is None else -null_sign
+            result = _compare_values(value_a, value_b)
+            if result:
+                return result * sign
+        return 0
+
+
+def _compare_values(a, b):
+    try:
+        return (a > b) - (a < b)
+    except TypeError:
+        # Mixed types (e.g. a number and a string) group by type name
+        a, b = type(a).__name__, type(b).__name__
+        return (a > b) - (a < b)
+
+
+def iter_json_array(path, read_bytes=SORT_READ_BYTES):
+    """
+    Yields (item, text_size) for each element of the top-level JSON array
+    in path, decoding one element at a time from a sliding buffer.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        position = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, position, eof
+            chunk = f.read(read_bytes)
+            if not chunk:
+                eof = True
+            buffer = buffer[position:] + chunk
+            position = 0
+
+        def skip_whitespace():
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position].isspace():
+                    position += 1
+                if position < len(buffer) or eof:
+                    return
+                fill()
+
+        skip_whitespace()
+        if position >= len(buffer) or buffer[position] != "[":
+            raise ValueError("Input file is not a valid JSON array")
+        position += 1
+
+        expect_item = True
+        while True:
+            skip_whitespace()
+            if position >= len(buffer):
+                raise ValueError("Unexpected end of JSON array")
+            if buffer[position] == "]":
+                return
+            if not expect_item:
+                if buffer[position] != ",":
+                    raise ValueError(f"Expected ',' in JSON array, got {buffer[position]!r}")
+                position += 1
+                expect_item = True
+                continue
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    fill()
+                    continue
+                # A number at the end of the buffer may continue in the next chunk
+                if end == len(buffer) and not eof:
+                    fill()
+                    continue
+                break
+            yield item, end - position
+            position = end
+            expect_item = False
+
+
+def _write_json_array(items, output_file):
+    # Same layout as json.dumps(list), one element at a time
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("[")
+        for index, item in enumerate(items):
+            if index:
+                f.write(", ")
+            f.write(json.dumps(item))
+        f.write("]")
+
+
+def _write_run(items, directory, index):
+    path = os.path.join(directory, f"run-{index:05d}.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for item in items:
+            f.write(json.dumps(item))
+            f.write("\n")
+    return path
+
+
+def _read_run(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def sort_json_array(input_file, output_file, criteria, memory_budget=SORT_MEMORY_BUDGET):
+    """
+    Sorts the JSON array in input_file into output_file. Arrays that fit the
+    memory budget are sorted in memory; larger ones are streamed into sorted
+    runs on disk and k-way merged, so peak memory stays near the budget.
+    Returns the number of runs written (0 for an in-memory sort).
+    """
+    if os.path.getsize(input_file) * SORT_MEMORY_FACTOR <= memory_budget:
+        with open(input_file, "r", encoding="utf-8") as f:
+            items = json.load(f)
+        if not isinstance(items, list):
+            raise ValueError("Input file is not a valid JSON array")
+        items.sort(key=criteria.key)
+        _write_json_array(items, output_file)
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="sort-", dir=SORT_TEMP_DIR) as directory:
+        runs = []
+        run = []
+        run_bytes = 0
+        for item, size in iter_json_array(input_file):
+            run.append(item)
+            run_bytes += size * SORT_MEMORY_FACTOR
+            if run_bytes >= memory_budget:
+                run.sort(key=criteria.key)
+                runs.append(_write_run(run, directory, len(runs)))
+                run = []
+                run_bytes = 0
+        if run:
+            run.sort(key=criteria.key)
+            runs.append(_write_run(run, directory, len(runs)))
+            run = []
+
+        # heapq.merge is stable, so ties keep their input order across runs
+        merged = heapq.merge(*(_read_run(path) for path in runs), key=criteria.key)
+        _write_json_array(merged, output_file)
+        print(f"sort_json_array: merged {len(runs)} sorted runs")
+        return len(runs)
@@ -0,0 +1,213 @@
+import os
+import json
+import shutil
+import hashlib
+
+from utils import CACHE_DIR
+
+EXCEL_BLOCK_ROWS = int(os.environ.get("EXCEL_BLOCK_ROWS", "10000"))
+# Sheets read once are kept as Parquet so later reads are columnar
+EXCEL_CACHE_ENABLED = os.environ.get("EXCEL_CACHE_ENABLED", "1") == "1"
+EXCEL_CACHE_DIR = os.path.join(CACHE_DIR, "excel")
+
+
+def _column_names(header):
+    """Unique string names for a header row, filling blanks by position."""
+    names = []
+    for index, name in enumerate(header):
+        name = str(name) if name is not None else f"column_{index}"
+        while name in names:
+            name = f"{name}_{index}"
+        names.append(name)
+    return names
+
+
+def _to_strings(frame):
+    """Every cell as a string, with empty cells kept as None."""
+    empty = frame.isna()
+    frame = frame.astype(str).astype(object)
+    return frame.mask(empty, None) if empty.values.any() else frame
+
+
+def _cache_dir(path):
+    # One entry per workbook path; an edited workbook replaces its entry
+    key = hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()
+    return os.path.join(EXCEL_CACHE_DIR, key)
+
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _sheet_file(directory, sheet):
+    return os.path.join(directory, hashlib.sha256(sheet.encode("utf-8")).hexdigest()[:16] + ".parquet")
+
+
+def _parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def iter_sheet_blocks(worksheet, block_rows=EXCEL_BLOCK_ROWS):
+    """
+    Streams DataFrames of strings from a read-only worksheet, block_rows
+    rows at a time. The first row is the header.
+    """
+    import pandas as pd
+
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    if not header:
+        return
+    columns = _column_names(header)
+    width = len(columns)
+    block = []
+    for row in rows:
+        # Read-only rows can be ragged; pad or trim to the header
+        block.append(row[:width] if len(row) >= width else row + (None,) * (width - len(row)))
+        if len(block) >= block_rows:
+            yield _to_strings(pd.DataFrame.from_records(block, columns=columns))
+            block = []
+    if block:
+        yield _to_strings(pd.DataFrame.from_records(block, columns=columns))
+
+
+class _SheetWriter:
+    """Writes one sheet's blocks to Parquet, published only when complete."""
+
+    def __init__(self, directory, sheet):
+        self.path = _sheet_file(directory, sheet)
+        self.temporary = f"{self.path}.{os.getpid()}.tmp"
+        self.writer = None
+
+    def write(self, frame):
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        table = table.cast(pa.schema([(name, pa.string()) for name in table.column_names]))
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.temporary, table.schema)
+        self.writer.write_table(table)
+
+    def close(self, completed):
+        if self.writer is not None:
+            self.writer.close()
+            if completed:
+                os.replace(self.temporary, self.path)
+        elif completed:
+            # Empty sheets are cached too, as a table without columns
+            import pyarrow as pa  # type: ignore
+            import pyarrow.parquet as pq  # type: ignore
+
+            pq.write_table(pa.table({}), self.path)
+        if os.path.exists(self.temporary):
+            os.remove(self.temporary)
+
+
+def _cached_blocks(directory, sheet, column):
+    import pyarrow.parquet as pq  # type: ignore
+
+    with open(os.path.join(directory, "sheets.json")) as f:
+        cached = json.load(f)["sheets"]
+    for sheet_name in cached:
+        if sheet is not None and sheet_name != sheet:
+            continue
+        parquet_file = pq.ParquetFile(_sheet_file(directory, sheet_name))
+        names = parquet_file.schema_arrow.names
+        if column is not None and column not in names:
+            continue
+        columns = [column] if column is not None else None
+        for batch in parquet_file.iter_batches(batch_size=EXCEL_BLOCK_ROWS, columns=columns):
+            frame = batch.to_pandas()
+            # Same shape as a streamed block: object cells, None when empty
+            yield sheet_name, frame.astype(object).mask(frame.isna(), None)
+
+
+def _is_cached(directory, sheet, signature):
+    try:
+        with open(os.path.join(directory, "sheets.json")) as f:
+            entry = json.load(f)
+        if entry["source"] != signature:
+            return False
+        cached = entry["sheets"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+    if sheet is not None and sheet not in cached:
+        return False
+    wanted = cached if sheet is None else [sheet]
+    return all(os.path.exists(_sheet_file(directory, name)) for name in wanted)
+
+
+def _reset_entry(directory, signature):
+    """Drops the sheets cached for an older version of the workbook."""
+    try:
+        with open(os.path.join(directory, "sheets.json")) as f:
+            stale = json.load(f).get("source") != signature
+    except (OSError, ValueError, AttributeError):
+        stale = os.path.isdir(directory)
+    if stale:
+        shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def iter_excel_blocks(handle, path, sheet=None, column=None):
+    """
+    (sheet_name, DataFrame of strings) blocks for an .xlsx file, from the
+    Parquet cache when the file is unchanged and from a streaming read
+    otherwise. A streaming read fills the cache for the sheets it covers.
+    """
+    use_cache = EXCEL_CACHE_ENABLED and _parquet_available()
+    directory = _cache_dir(path) if use_cache else None
+    signature = _source_signature(path) if use_cache else None
+
+    if use_cache and _is_cached(directory, sheet, signature):
+        yield from _cached_blocks(directory, sheet, column)
+        return
+
+    from openpyxl import load_workbook  # type: ignore
+
+    workbook = load_workbook(handle, read_only=True, data_only=True)
+    try:
+        names = workbook.sheetnames
+        if sheet is not None and sheet not in names:
+            raise ValueError(f"Sheet not found: {sheet}")
+        if use_cache:
+            _reset_entry(directory, signature)
+            with open(os.path.join(directory, "sheets.json"), "w") as f:
+                json.dump({"source": signature, "sheets": names}, f)
+
+        for sheet_name in names:
+            if sheet is not None and sheet_name != sheet:
+                continue
+            writer = _SheetWriter(directory, sheet_name) if use_cache else None
+            completed = False
+            try:
+                for frame in iter_sheet_blocks(workbook[sheet_name]):
+                    if writer is not None:
+                        writer.write(frame)
+                    if column is not None:
+                        if column not in frame.columns:
+                            # Keep reading so the whole sheet is cached
+                            continue
+                        frame = frame[[column]]
+                    yield sheet_name, frame
+                completed = True
+            finally:
+                if writer is not None:
+                    writer.close(completed)
+    finally:
+        workbook.close()
+
+
+def iter_excel_cells(handle, path, sheet=None, column=None):
+    """Non-empty cells of an .xlsx file as strings, row by row."""
+    for _, frame in iter_excel_blocks(handle, path, sheet, column):
+        for row in frame.itertuples(index=False, name=None):
+            for value in row:
+                if value is not None:
+                    yield value
@@ -0,0 +1,984 @@
+"""
+Tool registrations: each tool's JSON schema, implementation, result message
+and whether it is IO- or CPU-bound. Implementations are referenced as
+"module:function" and only imported when the tool is first called.
+"""
+
+from registry import registry
+
+registry.register(
+    "helper:online_script_runner",
+    message="Command executed: {result}",
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "online_script_runner",
+            "description": "Use this function if the task requires to install a package and run a script from a url with provided arguments.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "url": {
+                        "type": "string",
+                        "description": "The url of the script to run.",
+                    },
+                    "email": {
+                        "type": "string",
+                        "description": "The email pass as an argument to the script.",
+                    },
+                    "package": {
+                        "type": "string",
+                        "description": "The package to install if not already installed, described in the task if any else leave blank.",
+                    },
+                },
+                "required": ["url", "email", "package"],
+            },
+        },
+    },
+)
+
+registry.register(
+    "utils:read_file",
+    message="{result}",
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "read_file",
+            "description": "use this function if the task requires to read a file.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "file_path": {
+                        "type": "string",
+                        "description": "The path of the file to read.",
+                    }
+                },
+                "required": ["file_path"],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:write_file",
+    message="File written successfully",
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "write_file",
+            "description": "use this function if the task requires to write content to a file.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "file_path": {
+                        "type": "string",
+                        "description": "The path of the file to write. if directory is not defined in task it will be data/",
+                    },
+                    "content": {
+                        "type": "string",
+                        "description": "The content to write to the file.",
+                    },
+                },
+                "required": ["file_path", "content"],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:format_file_with_prettier",
+    message="File formatted successfully",
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "format_file",
+            "description": "use this function if the task requires to format a file using prettier.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "file_path": {
+                        "type": "string",
+                        "description": "The path of the file to format.",
+                    },
+                    "prettier_version": {
+                        "type": "string",
+                        "description": "The version of prettier to use.",
+                    },
+                },
+                "required": ["file_path", "prettier_version"],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:count_dates",
+    message="Date counting completed. Result written to {output_file}",
+    kind="cpu",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "count_dates",
+            "description": "Count the number of occurances of a specific weekday, date, month, year or hour in a list of dates in a file.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "input_file": {
+                        "type": "string",
+                        "description": "Path to the file containing the dates, one date per line.",
+                    },
+                    "output_file": {
+                        "type": "string",
+                        "description": "Path to the file to write the count to.",
+                    },
+                    "date_part": {
+                        "type": "string",
+                        "enum": ["weekday", "date", "month", "year", "hour"],
+                        "description": "The part of the date to count. can be 'weekday', 'date', 'month', 'year' or 'hour'.",
+                    },
+                    "value_to_count": {
+                        "type": "string",
+                        "description": """The specific weekday, date or month to count. 
+                        For weekday, use the full name (e.g., 'Monday'). 
+                        For date, use YYYY-MM-DD format. 
+                        For month, use the full month name (e.g., 'January').
+                        For year, use the four digit year (e.g., '2024').
+                        For hour, use the hour of the day from 0 to 23.""",
+                    },
+                    "column": {
+                        "type": "string",
+                        "description": "For CSV or Excel files, the name of the column holding the dates. Leave out to detect it automatically.",
+                    },
+                },
+                "required": [
+                    "input_file",
+                    "output_file",
+                    "date_part",
+                    "value_to_count",
+                ],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:sort_contacts",
+    message="Contacts sorted and written to {output_file}",
+    kind="cpu",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "sort_contacts",
+            "description": "Sort a JSON array of contacts in a file based on specified fields and order",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "input_file": {
+                        "type": "string",
+                        "description": "Path to the JSON file containing the array of contacts.",
+                    },
+                    "output_file": {
+                        "type": "string",
+                        "description": "Path to the file to write the sorted JSON array to.",
+                    },
+                    "sort_fields": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": """
+                        Array of the field names to sort by (e.g., ['lastname', 'first_name']).
+                        The order of fields in this array dertermines the sorting priority.
+                        """,
+                    },
+                    "sort_direction": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": ["asc", "desc"]},
+                        "description": """
+                        Array of sort directions 
+                        ('asc' for ascending, 'desc' for descending)
+                        corresponding to the sort_fields. 
+                        Must be the same length as sort_fields.
+                        """,
+                    },
+                    "null_order": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": ["first", "last"]},
+                        "description": """
+                        Optional array saying whether contacts missing a field
+                        sort 'first' or 'last' (the default) for each sort_field.
+                        """,
+                    },
+                },
+                "required": [
+                    "input_file",
+                    "output_file",
+                    "sort_fields",
+                    "sort_direction",
+                ],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:extract_log_info",
+    message="Log info extracted and written to {output_file}",
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "extract_log_info",
+            "description": """"Extracts information from .log files based on various criteria, writing the extracted content to an output file.""",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "log_directory": {
+                        "type": "string",
+                        "description": "Path to the directory containing the .log files.",
+                    },
+                    "sort_order": {
+                        "type": "string",
+                        "enum": [
+                            "newest",
+                            "oldest",
+                            "name_asc",
+                            "name_desc",
+                            "none",
+                            "size_asc",
+                            "size_desc",
+                        ],
+                        "description": """How to sort the .log files before extraction. 
+                            'newest' is most recently modified first, 
+                            'oldest' is least recently modified first, 
+                            'name_asc' is alphabetical, 
+                            'name_desc' is reverse alphabetical, 
+                            'size_asc' is smallest first, 
+                            'size_desc' is largest first and 
+                            'none' indicates no sorting.
+                        """,
+                    },
+                    "date_filter_type": {
+                        "type": "string",
+                        "enum": ["before", "after", "on", "between", "none"],
+                        "description": """Filter .log files based on their modification date. 
+                            'before' for files modified before a certain date, 
+                            'after' for after a date, 
+                            'on' for a specific date, 
+                            'between' for a date range and
+                            'none' to extract from all files.
+                        """,
+                    },
+                    "date_filter_value": {
+                        "type": "string",
+                        "description": """
+                            The date or date range for filtering. 
+                            If date_filter_type is 'before', 'after', or 'on', provide a single date (YYYY-MM-DD). 
+                            If 'between', provide two dates separated by a comma (YYYY-MM-DD,YYYY-MM-DD). 
+                            Required when date_filter_type is not 'none'.
+                        """,
+                    },
+                    "num_files": {
+                        "type": "integer",
+                        "description": "(Optional) The number of .log files to process. If omitted, all log files are processed.",
+                    },
+                    "output_file": {
+                        "type": "string",
+                        "description": "Path to the file to write the extracted lines to.",
+                    },
+                    "extraction_type": {
+                        "type": "string",
+                        "enum": [
+                            "last",
+                            "first",
+                            "all",
+                            "line_number",
+                            "regex",
+                            "lines_range",
+                        ],
+                        "description": """
+                            What to extract from each .log file. 
+                            'first' is the first line, 
+                            'last' is the last line, 
+                            'all' means all lines joined, 
+                            'line_number' extracts a specific line, 
+                            'regex' extracts lines matching a pattern, 
+                            and 'lines_range' extracts a range of lines.
+                        """,
+                    },
+                    "line_number": {
+                        "type": "integer",
+                        "description": "(Optional) The line number to extract (1-based).  Required if extraction_type is 'line_number'.",
+                    },
+                    "lines_range_start": {
+                        "type": "integer",
+                        "description": """
+                            (Optional) The starting line number to extract (1-based). 
+                            Required if extraction_type is 'lines_range'.
+                        """,
+                    },
+                    "lines_range_end": {
+                        "type": "integer",
+                        "description": "(Optional) The ending line number to extract (1-based, inclusive). Required if extraction_type is 'lines_range'.",
+                    },
+                    "regex_pattern": {
+                        "type": "string",
+                        "description": "(Optional) The regular expression pattern to match lines.  Required if extraction_type is 'regex'.",
+                    },
+                },
+                "required": [
+                    "log_directory",
+                    "sort_order",
+                    "output_file",
+                    "extraction_type",
+                    "date_filter_type",
+                ],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:extract_markdown_headers",
+    message="Markdown processing completed. Result written to {output_file}",
+    kind="cpu",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "extract_markdown_headers",
+            "description": """
+                Finds all Markdown (.md) files in a directory, 
+                extracts specified occurrences of headers of a specific level from each file, 
+                and creates an index file mapping filenames to their titles.
+            """,
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "md_directory": {
+                        "type": "string",
+                        "description": "Path to the directory containing the .md files.",
+                    },
+                    "output_file": {
+                        "type": "string",
+                        "description": "Path to the output file to save the processed content.",
+                    },
+                    "header_level": {
+                        "type": "string",
+                        "enum": ["h1", "h2", "h3", "h4", "h5", "h6"],
+                        "description": """ 
+                            The level of the headers to extract: 'h1', 'h2', 'h3', 'h4', 'h5', or 'h6'.
+                        """,
+                    },
+                    "header_occurrence": {
+                        "type": "string",
+                        "enum": ["first", "nth", "last", "all"],
+                        "description": """ 
+                            Which occurrence of the header to extract: 'first', 'last', 'all', or 'nth'.
+                        """,
+                    },
+                    "n_value": {
+                        "type": "string",
+                        "description": """
+                            (Optional) the n value if header occurence is nth.
+                        """,
+                    },
+                },
+                "required": [
+                    "md_directory",
+                    "header_level",
+                    "header_occurrence",
+                    "output_file",
+                ],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:extract_information",
+    message="Information extracted and written to {output_file}",
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "extract_information",
+            "description": """
+                use this function if the task requires to extract information from a file with provided instructions
+                (e.g extract some information from file containg email message)                                        
+                and write the extracted information to an output file.
+            """,
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "input_file": {
+                        "type": "string",
+                        "description": "Path to the file from which to extract information.",
+                    },
+                    "output_file": {
+                        "type": "string",
+                        "description": "Path to the file to write the extracted information.",
+                    },
+                    "extraction_instruction": {
+                        "type": "string",
+                        "description": "A plain-English instruction on what to extract from the file (e.g., 'the sender's email address', 'the customer ID', 'the product name').",
+                    },
+                },
+                "required": ["input_file", "output_file", "extraction_instruction"],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:process_image",
+    message="Image processing completed. Result written to {output_file}",
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "process_image",
+            "description": """
+                use this function if the task requires to process and image
+                based on a plain english instruction,
+                write the result to an output file.
+            """,
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "image_path": {
+                        "type": "string",
+                        "description": "Path to the image file to process.",
+                    },
+                    "output_file": {
+                        "type": "string",
+                        "description": "Path to the file where the processing result will be written..",
+                    },
+                    "processing_instruction": {
+                        "type": "string",
+                        "description": "A plain-English instruction on what to do with the image (e.g., 'extract credit card number', 'describe the image', 'identify objects in the image').",
+                    },
+                },
+                "required": ["image_path", "output_file", "processing_instruction"],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:extract_from_images",
+    message="Image extraction completed ({result}). Results written to {output_file}",
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "extract_from_images",
+            "description": """
+                use this function if the task requires to run the same plain english
+                instruction over many images (a folder or glob pattern of images),
+                writing one JSON line per image to an output file.
+            """,
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "image_pattern": {
+                        "type": "string",
+                        "description": "A glob pattern (e.g. data/receipts/*.jpg) or a directory of images.",
+                    },
+                    "output_file": {
+                        "type": "string",
+                        "description": "Path to the JSONL file where the results will be written.",
+                    },
+                    "processing_instruction": {
+                        "type": "string",
+                        "description": "A plain-English instruction on what to extract from each image (e.g., 'the total amount', 'the ID number').",
+                    },
+                },
+                "required": ["image_pattern", "output_file", "processing_instruction"],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:find_texts_with_embeddings",
+    message="Text analysis completed. Result written to {output_file}",
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "find_texts_with_embeddings",
+            "description": """
+               Finds similar or dissimilar texts in a file using text embeddings generated by the LLM. 
+               Writes the pair of texts to an output file.
+            """,
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "input_file": {
+                        "type": "string",
+                        "description": "Path to the file containing the texts, one text per line.",
+                    },
+                    "output_file": {
+                        "type": "string",
+                        "description": "Path to the file where the pair of texts will be written, one text per line.",
+                    },
+                    "find_type": {
+                        "type": "string",
+                        "enum": ["most_similar", "most_dissimilar"],
+                        "description": "Whether to find 'similar' or 'dissimilar' texts.",
+                    },
+                    "input_format": {
+                        "type": "string",
+                        "enum": ["one_per_line", "csv", "space_separated"],
+                        "description": "Format of the text input: 'one_per_line', 'csv', or 'space_separated'.",
+                    },
+                    "output_format": {
+                        "type": "string",
+                        "enum": [
+                            "one_per_line",
+                            "space_separated",
+                            "comma_separated",
+                        ],
+                        "description": "Format of the text output: 'one_per_line', 'space_separated', or 'comma_separated'.",
+                    },
+                },
+                "required": [
+                    "input_file",
+                    "output_file",
+                    "find_type",
+                    "input_format",
+                    "output_format",
+                ],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:query_database",
+    message="Database query completed. Result written to {output_file}",
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "query_database",
+            "description": """
+                Executes a SQL query on a SQLite or DuckDB database and writes the result to an output file.
+            """,
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "db_path": {
+                        "type": "string",
+                        "description": "Path to the SQLite database file.",
+                    },
+                    "output_file": {
+                        "type": "string",
+                        "description": "Path to the file where the query result will be written.",
+                    },
+                    "query": {
+                        "type": "string",
+                        "description": "The SQL query to execute.",
+                    },
+                    "is_deleting": {
+                        "type": "boolean",
+                        "description": "Whether the query is deleting/removing or not.",
+                    },
+                    "output_type": {
+                        "type": "string",
+                        "enum": ["single_value", "json", "csv", "text"],
+                        "description": "The desired output format: 'single_value' for a single number, 'json' for JSON, 'csv' for CSV, and 'text' for plain text.",
+                    },
+                },
+                "required": [
+                    "db_path",
+                    "output_file",
+                    "query",
+                    "is_deleting",
+                    "output_type",
+                ],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:reject_task",
+    message="{result}",
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "reject_task",
+            "description": "Rejects the task if it violates the security policy (e.g., deleting files or writing to an existing file).",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "reason": {
+                        "type": "string",
+                        "description": "The reason for rejecting the task. This should clearly state that deleting or removing data is not allowed..",
+                    },
+                },
+                "required": ["reason"],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:fetch_and_save_data",
+    message="Data fetched and saved to {result}",
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "fetch_and_save_data",
+            "description": "Fetches data from an API and saves it to a file within the /data directory.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "api_url": {
+                        "type": "string",
+                        "description": "The URL of the API endpoint to fetch data from.",
+                    },
+                    "output_path": {
+                        "type": "string",
+                        "description": "Path where the fetched data will be saved. if not said then the file will be saved in /data directory.",
+                    },
+                    "filename": {
+                        "type": "string",
+                        "description": "(Optional) The name of the file where the fetched data will be saved.",
+                    },
+                },
+                "required": ["api_url", "output_path"],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:clone_git_repo",
+    message="Git repository cloned and saved to {output_path}",
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "clone_git_repo",
+            "description": "Clone a git repository.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "repo_url": {
+                        "type": "string",
+                        "description": "The URL of the git repository to clone.",
+                    },
+                    "output_path": {
+                        "type": "string",
+                        "description": "Path where the cloned repository will be saved. if not said then the file will be saved in /data directory.",
+                    },
+                },
+                "required": ["repo_url", "output_path"],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:scrape_website",
+    message="Data extracted from website and saved to {output_path}",
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "scrape_website",
+            "description": "Extract specific data from a website based on user-defined criteria.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "url": {
+                        "type": "string",
+                        "description": "The URL of the website to scrape.",
+                    },
+                    "output_path": {
+                        "type": "string",
+                        "description": "Path where the extracted data will be saved. If not specified, the file will be saved in the /data directory.",
+                    },
+                    "filename": {
+                        "type": "string",
+                        "description": "(Optional) The name of the file where the extracted data will be saved.",
+                    },
+                    "scrape_target": {
+                        "type": "array",
+                        "description": "List of elements to scrape from the webpage.",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "element": {
+                                    "type": "string",
+                                    "description": "The HTML tag, CSS selector, or XPath of the element to scrape.",
+                                },
+                                "attribute": {
+                                    "type": "string",
+                                    "description": "(Optional) If specified, extracts the attribute (e.g., 'href', 'src') instead of text content.",
+                                },
+                            },
+                            "required": ["element"],
+                        },
+                    },
+                },
+                "required": ["url", "output_path", "scrape_target"],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:compress_image",
+    message="Image compressed and saved to {output_file}",
+    kind="cpu",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "compress_image",
+            "description": "Compress an image.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "image_path": {
+                        "type": "string",
+                        "description": "The path of the image to compress.",
+                    },
+                    "output_file": {
+                        "type": "string",
+                        "description": "Path where the compressed image will be saved. if not described in task then the file will be saved in /data with same name as input + 'compressed' directory.",
+                    },
+                    "quality": {
+                        "type": "integer",
+                        "description": "The quality of the compressed image (0-100).",
+                        "minimum": 0,
+                        "maximum": 100,
+                    },
+                },
+                "required": ["image_path", "output_file", "quality"],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:resize_image",
+    message="Image resized and saved to {output_file}",
+    kind="cpu",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "resize_image",
+            "description": "Resizes an image.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "image_path": {
+                        "type": "string",
+                        "description": "The path to the image file.",
+                    },
+                    "output_file": {
+                        "type": "string",
+                        "description": "The path to write the resized image to. if not described in task then the file will be saved in /data with same name as input + 'resized' directory.",
+                    },
+                    "width": {
+                        "type": "integer",
+                        "description": "The width of the resized image.",
+                        "minimum": 1,
+                    },
+                    "height": {
+                        "type": "integer",
+                        "description": "The height of the resized image.",
+                        "minimum": 1,
+                    },
+                },
+                "required": ["image_path", "output_file", "width", "height"],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:batch_process_images",
+    message="Images processed. Manifest written to {result}",
+    # Runs its own process pool, so the calling thread only waits
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "batch_process_images",
+            "description": "Compress or resize many images at once, selected by a glob pattern or a directory.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "image_pattern": {
+                        "type": "string",
+                        "description": "A glob pattern (e.g. data/photos/*.jpg) or a directory of images.",
+                    },
+                    "output_directory": {
+                        "type": "string",
+                        "description": "Directory where the processed images and manifest.json are written.",
+                    },
+                    "operation": {
+                        "type": "string",
+                        "enum": ["compress", "resize"],
+                        "description": "Whether to compress or resize the images.",
+                    },
+                    "quality": {
+                        "type": "integer",
+                        "description": "(Optional) Quality (0-100). Required for 'compress'.",
+                        "minimum": 0,
+                        "maximum": 100,
+                    },
+                    "width": {
+                        "type": "integer",
+                        "description": "(Optional) Target width. Required for 'resize'.",
+                        "minimum": 1,
+                    },
+                    "height": {
+                        "type": "integer",
+                        "description": "(Optional) Target height. Required for 'resize'.",
+                        "minimum": 1,
+                    },
+                    "keep_exif": {
+                        "type": "boolean",
+                        "description": "(Optional) Keep EXIF metadata in the outputs. Defaults to false.",
+                    },
+                },
+                "required": ["image_pattern", "output_directory", "operation"],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:transcribe_audio",
+    message="Audio transcription completed. Result written to {output_path}",
+    kind="cpu",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "transcribe_audio",
+            "description": "Transcribes an audio file.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "audio_path": {
+                        "type": "string",
+                        "description": "The path to the audio file.",
+                    },
+                    "output_path": {
+                        "type": "string",
+                        "description": "The path to write the transcription to.",
+                    },
+                },
+                "required": ["audio_path", "output_path"],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:convert_markdown_to_html",
+    message="Markdown converted to HTML and saved to {output_file}",
+    kind="cpu",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "convert_markdown_to_html",
+            "description": "Convert Markdown to HTML.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "markdown_path": {
+                        "type": "string",
+                        "description": "The path to the Markdown file.",
+                    },
+                    "output_file": {
+                        "type": "string",
+                        "description": "The path to write the HTML file to.",
+                    },
+                },
+                "required": ["markdown_path", "output_file"],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:filter_csv_to_json_api",
+    message="CSV filtered and JSON data served at {api_endpoint}",
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "filter_csv_to_json_api",
+            "description": "Write an API endpoint that filters a CSV file and returns JSON data.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "csv_path": {
+                        "type": "string",
+                        "description": "The path to the CSV file.",
+                    },
+                    "filter_column": {
+                        "type": "string",
+                        "description": "The column to filter by.",
+                    },
+                    "filter_value": {
+                        "type": "string",
+                        "description": "The value to filter for.",
+                    },
+                    "api_endpoint": {
+                        "type": "string",
+                        "description": "The API endpoint where the data will be served.",
+                    },
+                },
+                "required": [
+                    "csv_path",
+                    "filter_column",
+                    "filter_value",
+                    "api_endpoint",
+                ],
+            },
+        },
+    },
+)
+
+registry.register(
+    "helper:write_code_and_run",
+    message="Code written and executed successfully",
+    kind="io",
+    schema={
+        "type": "function",
+        "function": {
+            "name": "generate_and_execute_code",
+            "description": "Generates Python code for a given task, ensuring safe execution and file handling. \
+    All file operations (reading and writing) must be restricted to the 'data/' directory.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "generated_code": {
+                        "type": "string",
+                        "description": "Python code that accomplishes the requested task. \
+                All file read and write operations must be restricted to the 'data/' directory. \
+                Any attempt to access files outside 'data/' should raise an error. \
+                If saving is required, the generated code must handle it inside 'data/'.",
+                    },
+                    "dependencies": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "List of additional Python dependencies required to run the generated code. \
+                Common built-in modules should not be included.",
+                    },
+                },
+                "required": ["generated_code", "dependencies"],
+            },
+        },
+    },
+)
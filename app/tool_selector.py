@@ -0,0 +1,97 @@
+import os
+import re
+import json
+import math
+from collections import Counter
+
+from utils import estimate_tokens
+
+TOOL_SUBSET_ENABLED = os.environ.get("TOOL_SUBSET_ENABLED", "1") == "1"
+TOOL_SUBSET_K = int(os.environ.get("TOOL_SUBSET_K", "4"))
+TOOL_SUBSET_MIN_SCORE = float(os.environ.get("TOOL_SUBSET_MIN_SCORE", "0.1"))
+
+# Tools that are sent with every subset: the security policy and the
+# catch-all code generator must always be available to the LLM.
+ALWAYS_INCLUDE = ("reject_task", "generate_and_execute_code")
+
+STOPWORDS = {
+    "a", "an", "the", "to", "of", "in", "and", "or", "is", "it", "for", "on",
+    "if", "be", "by", "as", "with", "from", "this", "that", "use", "function",
+    "task", "file", "path", "data", "e", "g", "will", "not", "which",
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z]+")
+
+
+def tokenize(text):
+    # Underscored identifiers such as count_dates contribute their parts
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(text.lower().replace("_", " "))
+        if token not in STOPWORDS
+    ]
+
+
+def _schema_text(tool):
+    function = tool["function"]
+    parts = [function["name"], function["name"], function.get("description", "")]
+    for name, prop in function.get("parameters", {}).get("properties", {}).items():
+        parts.append(name)
+        parts.append(prop.get("description", ""))
+        parts.extend(str(value) for value in prop.get("enum", []))
+    return " ".join(parts)
+
+
+class ToolSelector:
+    """TF-IDF scorer that picks the tools most relevant to a task."""
+
+    def __init__(self, tools, k=TOOL_SUBSET_K, min_score=TOOL_SUBSET_MIN_SCORE):
+        self.tools = tools
+        self.k = k
+        self.min_score = min_score
+        documents = [Counter(tokenize(_schema_text(tool))) for tool in tools]
+        document_frequency = Counter()
+        for document in documents:
+            document_frequency.update(document.keys())
+        self.idf = {
+            term: math.log((1 + len(documents)) / (1 + count)) + 1
+            for term, count in document_frequency.items()
+        }
+        self.vectors = [self._weigh(document) for document in documents]
+
+    def _weigh(self, counts):
+        vector = {
+            term: (1 + math.log(count)) * self.idf[term]
+            for term, count in counts.items()
+            if term in self.idf
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+    def scores(self, task):
+        query = self._weigh(Counter(tokenize(task)))
+        return [
+            sum(weight * vector.get(term, 0.0) for term, weight in query.items())
+            for vector in self.vectors
+        ]
+
+    def select(self, task):
+        """
+        Returns (tools, confident). When no tool scores above min_score the
+        full tool list is returned so the LLM can still choose freely.
+        """
+        scores = self.scores(task)
+        ranked = sorted(range(len(self.tools)), key=lambda i: scores[i], reverse=True)
+        if not ranked or scores[ranked[0]] < self.min_score:
+            return self.tools, False
+
+        chosen = set(ranked[: self.k])
+        for i, tool in enumerate(self.tools):
+            if tool["function"]["name"] in ALWAYS_INCLUDE:
+                chosen.add(i)
+        # Keep the original order so equal subsets hash identically
+        return [tool for i, tool in enumerate(self.tools) if i in chosen], True
+
+
+def prompt_tokens(tools):
+    return estimate_tokens(json.dumps(tools))
@@ -1,15 +1,117 @@
 import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import httpx # type: ignore
 import csv
-import json
-import pandas as pd
-import docx # type: ignore
+import weakref
 
 AIPROXY_TOKEN = os.environ.get("AIPROXY_TOKEN")
+AIPROXY_URL = "https://aiproxy.sanand.workers.dev/openai/v1"
+LLM_MODEL = "gpt-4o-mini"
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Local caches live inside the data directory so they share its volume
+CACHE_DIR = os.path.join("data", ".cache")
+
+# Connection pool settings shared by the sync and async clients
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.environ.get("HTTP2_ENABLED", "1") == "1"
+
+# Embedding requests are split into batches that stay under provider limits
+EMBEDDING_BATCH_TOKENS = int(os.environ.get("EMBEDDING_BATCH_TOKENS", "50000"))
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "2048"))
+EMBEDDING_CONCURRENCY = int(os.environ.get("EMBEDDING_CONCURRENCY", "4"))
+EMBEDDING_RETRIES = int(os.environ.get("EMBEDDING_RETRIES", "3"))
+
+_client = None
+# One async client per event loop; an entry goes away with its loop
+_async_clients = weakref.WeakKeyDictionary()
+_client_lock = threading.Lock()
+
+
+def _client_options():
+    http2 = HTTP2_ENABLED
+    if http2:
+        try:
+            import h2  # type: ignore # noqa: F401
+        except ImportError:
+            http2 = False  # httpx needs the h2 package for HTTP/2
+
+    return {
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+    }
+
+
+def get_http_client():
+    """Returns the process-wide pooled sync client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        with _client_lock:
+            if _client is None or _client.is_closed:
+                _client = httpx.Client(**_client_options())
+    return _client
+
+
+def get_async_http_client():
+    """
+    Returns the pooled async client of the running event loop. An
+    AsyncClient cannot be shared across event loops, so each loop (e.g.
+    each asyncio.run, in whatever thread) gets and keeps its own pool.
+    """
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(**_client_options())
+            _async_clients[loop] = client
+    return client
+
+
+def close_http_client():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+async def aclose_http_client():
+    """Closes the running loop's async client; other loops keep theirs."""
+    with _client_lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
 
 
-def request_constructor():
-    url = "https://aiproxy.sanand.workers.dev/openai/v1/chat/completions"
+def run_async(coroutine):
+    """
+    asyncio.run for code that uses the pooled async client: this loop's
+    client is closed before the loop ends instead of being left open on a
+    dead loop.
+    """
+
+    async def run_and_close():
+        try:
+            return await coroutine
+        finally:
+            await aclose_http_client()
+
+    return asyncio.run(run_and_close())
+
+
+def request_constructor(endpoint="chat/completions"):
+    url = f"{AIPROXY_URL}/{endpoint}"
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {AIPROXY_TOKEN}",
@@ -17,12 +119,33 @@ def request_constructor():
     return url, headers
 
 
-def call_llm_with_functions(task, tools):
-    print("llm_called")
-    url, headers = request_constructor()
+def _post(url, headers, data):
+    try:
+        response = get_http_client().post(url, headers=headers, json=data)
+        response.raise_for_status()  # Raises an HTTPError for bad responses (4xx, 5xx)
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        print(f"Error calling OpenAI API: {e} {e.response.text}")
+        raise Exception(f"Error calling OpenAI API: {e}")
+    except httpx.HTTPError as e:
+        raise Exception(f"Error calling OpenAI API: {e}")
+
+
+async def _apost(url, headers, data):
+    try:
+        response = await get_async_http_client().post(url, headers=headers, json=data)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        print(f"Error calling OpenAI API: {e} {e.response.text}")
+        raise Exception(f"Error calling OpenAI API: {e}")
+    except httpx.HTTPError as e:
+        raise Exception(f"Error calling OpenAI API: {e}")
+
 
-    data = {
-        "model": "gpt-4o-mini",
+def _function_call_payload(task, tools):
+    return {
+        "model": LLM_MODEL,
         "messages": [
             {"role": "user", "content": task},
             {
@@ -38,16 +161,20 @@ def call_llm_with_functions(task, tools):
         "tool_choice": "auto",
     }
 
-    try:
-        response = httpx.post(url, headers=headers, json=data, timeout=10)
-        response.raise_for_status()
-        return response.json()  # Raises an HTTPError for bad responses (4xx, 5xx)
-    except httpx.HTTPError as e:
-        print(f"Error calling OpenAI API: {e} {response.text}")
-        raise Exception(f"Error calling OpenAI API: {e}")
+
+def call_llm_with_functions(task, tools):
+    print("llm_called")
+    url, headers = request_constructor()
+    return _post(url, headers, _function_call_payload(task, tools))
 
 
-def llm_text_extraction(extraction_instruction, content):
+async def acall_llm_with_functions(task, tools):
+    print("llm_called")
+    url, headers = request_constructor()
+    return await _apost(url, headers, _function_call_payload(task, tools))
+
+
+def _text_extraction_payload(extraction_instruction, content):
 
     schema = {
         "type": "object",
@@ -61,9 +188,8 @@ def llm_text_extraction(extraction_instruction, content):
         "required": ["extracted_information"],
     }
 
-    url, headers = request_constructor()
-    data = {
-        "model": "gpt-4o-mini",
+    return {
+        "model": LLM_MODEL,
         "messages": [
             {
                 "role": "system",
@@ -86,26 +212,31 @@ def llm_text_extraction(extraction_instruction, content):
             "function": {"name": "extract_information"},
         },
     }
-    try:
-        response = httpx.post(url, headers=headers, json=data, timeout=10)
-        response.raise_for_status()
-        
-        return response.json()
-    except httpx.HTTPError as e:
-        raise Exception(f"Error calling OpenAI API: {e}")
 
 
-def llm_process_image(image_url, image_extension, processing_instruction):
+def llm_text_extraction(extraction_instruction, content):
+    url, headers = request_constructor()
+    return _post(
+        url, headers, _text_extraction_payload(extraction_instruction, content)
+    )
+
 
+async def allm_text_extraction(extraction_instruction, content):
     url, headers = request_constructor()
+    return await _apost(
+        url, headers, _text_extraction_payload(extraction_instruction, content)
+    )
+
+
+def _image_payload(image_url, image_extension, processing_instruction):
     modified_instruction = f"""
     You are an expert document analyst reviewing an image-based record.
     Carefully examine the provided image and follow the instructions:
     
     {processing_instruction}
     """
-    data = {
-        "model": "gpt-4o-mini",
+    return {
+        "model": LLM_MODEL,
         "messages": [
             {
                 "role": "system",
@@ -129,32 +260,181 @@ def llm_process_image(image_url, image_extension, processing_instruction):
             }
         ]
     }
-    
-    try: 
-        response = httpx.post(url, headers=headers, json=data, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except httpx.HTTPError as e:
-        raise Exception(f"Error calling OpenAI API: {e}")
 
-def text_embedding_llm(texts):
-    url = "https://aiproxy.sanand.workers.dev/openai/v1/embeddings"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {AIPROXY_TOKEN}",
+
+def llm_process_image(image_url, image_extension, processing_instruction):
+    url, headers = request_constructor()
+    return _post(
+        url,
+        headers,
+        _image_payload(image_url, image_extension, processing_instruction),
+    )
+
+
+async def allm_process_image(image_url, image_extension, processing_instruction):
+    url, headers = request_constructor()
+    return await _apost(
+        url,
+        headers,
+        _image_payload(image_url, image_extension, processing_instruction),
+    )
+
+
+def _structured_image_payload(image_url, image_extension, extraction_instruction):
+    schema = {
+        "type": "object",
+        "properties": {
+            "ocr_text": {
+                "type": "string",
+                "description": "All readable text and numbers in the image, transcribed in reading order.",
+            },
+            "extracted_information": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "The information requested by the instruction.",
+            },
+        },
+        "required": ["ocr_text", "extracted_information"],
+    }
+    payload = _image_payload(
+        image_url,
+        image_extension,
+        f'Transcribe all readable text and extract the "{extraction_instruction}".',
+    )
+    payload["tools"] = [
+        {
+            "type": "function",
+            "function": {
+                "name": "extract_information",
+                "description": "Return the image transcription and the extracted information.",
+                "parameters": schema,
+            },
+        }
+    ]
+    payload["tool_choice"] = {
+        "type": "function",
+        "function": {"name": "extract_information"},
     }
-    data = {
+    return payload
+
+
+def llm_process_image_structured(image_url, image_extension, extraction_instruction):
+    url, headers = request_constructor()
+    return _post(
+        url,
+        headers,
+        _structured_image_payload(image_url, image_extension, extraction_instruction),
+    )
+
+
+async def allm_process_image_structured(image_url, image_extension, extraction_instruction):
+    url, headers = request_constructor()
+    return await _apost(
+        url,
+        headers,
+        _structured_image_payload(image_url, image_extension, extraction_instruction),
+    )
+
+
+def _embedding_payload(texts, model):
+    return {
         "input": texts,
-        "model": "text-embedding-3-small",
+        "model": model,
         "encoding_format": "float"
     }
 
-    try:
-        response = httpx.post(url, headers=headers, data= json.dumps(data), timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except httpx.HTTPError as e:
-        raise Exception(f"Error calling OpenAI API: {e}")
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English text
+    return len(text) // 4 + 1
+
+
+def batch_texts(texts, max_tokens=EMBEDDING_BATCH_TOKENS, max_items=EMBEDDING_BATCH_SIZE):
+    """Splits texts into (start_index, batch) pairs sized by estimated tokens."""
+    batches = []
+    batch = []
+    batch_tokens = 0
+    start = 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_items):
+            batches.append((start, batch))
+            batch = []
+            batch_tokens = 0
+            start = i
+        batch.append(text)
+        batch_tokens += tokens
+    if batch:
+        batches.append((start, batch))
+    return batches
+
+
+def _merge_embedding_responses(responses, model):
+    data = []
+    prompt_tokens = 0
+    for start, response in responses:
+        for item in response["data"]:
+            data.append({**item, "index": start + item["index"]})
+        prompt_tokens += response.get("usage", {}).get("prompt_tokens", 0)
+    data.sort(key=lambda item: item["index"])
+    return {
+        "object": "list",
+        "data": data,
+        "model": model,
+        "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+    }
+
+
+def _embed_batch(batch, model):
+    url, headers = request_constructor("embeddings")
+    for attempt in range(EMBEDDING_RETRIES):
+        try:
+            return _post(url, headers, _embedding_payload(batch, model))
+        except Exception:
+            if attempt == EMBEDDING_RETRIES - 1:
+                raise
+            time.sleep(2**attempt)
+
+
+async def _aembed_batch(batch, model, semaphore):
+    url, headers = request_constructor("embeddings")
+    async with semaphore:
+        for attempt in range(EMBEDDING_RETRIES):
+            try:
+                return await _apost(url, headers, _embedding_payload(batch, model))
+            except Exception:
+                if attempt == EMBEDDING_RETRIES - 1:
+                    raise
+                await asyncio.sleep(2**attempt)
+
+
+def text_embedding_llm(texts, model=EMBEDDING_MODEL):
+    batches = batch_texts(texts)
+    if len(batches) <= 1:
+        return _merge_embedding_responses(
+            [(start, _embed_batch(batch, model)) for start, batch in batches], model
+        )
+
+    # The pooled sync client is thread-safe, so the worker count bounds the
+    # number of requests in flight.
+    with ThreadPoolExecutor(max_workers=EMBEDDING_CONCURRENCY) as executor:
+        futures = [
+            (start, executor.submit(_embed_batch, batch, model))
+            for start, batch in batches
+        ]
+        responses = [(start, future.result()) for start, future in futures]
+    return _merge_embedding_responses(responses, model)
+
+
+async def atext_embedding_llm(texts, model=EMBEDDING_MODEL):
+    semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+    batches = batch_texts(texts)
+    results = await asyncio.gather(
+        *(_aembed_batch(batch, model, semaphore) for _, batch in batches)
+    )
+    return _merge_embedding_responses(
+        [(start, result) for (start, _), result in zip(batches, results)], model
+    )
 
 
 def validate_path(file_path):
@@ -179,71 +459,255 @@ def read_file(file_path: str) -> str:
         raise FileNotFoundError(f"File not found: {file_path}")
 
 
-def extract_text_from_csv(file_path):
-    """Extracts all content from a CSV file as a list of strings."""
-    file_path = validate_path(file_path)
+# Extractors yield text items; extract_text chunks them for callers
+EXTRACT_CHUNK_ITEMS = int(os.environ.get("EXTRACT_CHUNK_ITEMS", "50000"))
+EXTRACTORS = {}
+EXTRACTOR_EXTENSIONS = {}
+EXTRACTOR_MIME_TYPES = {}
+
+
+class ExtractProgress:
+    """Bytes of the source file consumed so far, read from its open handle."""
+
+    def __init__(self, file_path):
+        self.total = os.path.getsize(file_path)
+        self.handle = None
+
+    def track(self, handle):
+        self.handle = handle
+        return handle
+
+    @property
+    def done(self):
+        if self.handle is None or self.handle.closed:
+            return self.total
+        return min(self.handle.tell(), self.total)
+
+
+def register_extractor(name, extensions=(), mime_types=()):
+    """Registers extractor(file_path, progress, column, sheet) -> iterator of str."""
+
+    def decorator(function):
+        EXTRACTORS[name] = function
+        for extension in extensions:
+            EXTRACTOR_EXTENSIONS[extension] = name
+        for mime_type in mime_types:
+            EXTRACTOR_MIME_TYPES[mime_type] = name
+        return function
+
+    return decorator
+
+
+def sniff_extractor(file_path):
+    """Extractor name for a file from its extension, MIME type or first bytes."""
+    import mimetypes
+    import zipfile
+
+    name = EXTRACTOR_EXTENSIONS.get(os.path.splitext(file_path)[1].lower())
+    if name:
+        return name
+    name = EXTRACTOR_MIME_TYPES.get(mimetypes.guess_type(file_path)[0])
+    if name:
+        return name
+
+    with open(file_path, "rb") as f:
+        head = f.read(2048)
+    if head.startswith(b"PK\x03\x04") and zipfile.is_zipfile(file_path):
+        with zipfile.ZipFile(file_path) as archive:
+            names = set(archive.namelist())
+        if "word/document.xml" in names:
+            return "docx"
+        if "xl/workbook.xml" in names:
+            return "excel"
+    if head.lstrip()[:1] in (b"{", b"[") and _is_json_prefix(head):
+        return "json"
+    return "text"
+
+
+def _is_json_prefix(head):
+    """
+    Whether head could be the start of one JSON document. JSON Lines
+    (a second value after the first) and logs such as "[2024-01-03] ..."
+    fail here and are read as text instead.
+    """
+    import io
+    from jsonstream import events, JSONStreamError
 
-    content = []
+    try:
+        for _ in events(io.StringIO(head.decode("utf-8", errors="ignore"))):
+            pass
+    except JSONStreamError as e:
+        # Running out of input only means the document goes on past head
+        return str(e).startswith(("Unexpected end", "Unterminated"))
+    return True
+
+
+def extract_text(
+    file_path, column=None, sheet=None, chunk_size=EXTRACT_CHUNK_ITEMS, on_progress=None
+):
+    """
+    Yields lists of up to chunk_size text items from any supported file.
+    column picks one CSV/Excel column by name (or index); sheet picks one
+    Excel sheet. on_progress(bytes_done, bytes_total) runs after each chunk.
+    """
+    file_path = validate_path(file_path)
+    name = sniff_extractor(file_path)
+    progress = ExtractProgress(file_path)
+    items = EXTRACTORS[name](file_path, progress, column=column, sheet=sheet)
+
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+            if on_progress:
+                on_progress(progress.done, progress.total)
+    if chunk:
+        yield chunk
+    if on_progress:
+        on_progress(progress.total, progress.total)
+
+
+def _column_index(header, column):
+    if column in header:
+        return header.index(column)
+    if str(column).isdigit() and int(column) < len(header):
+        return int(column)
+    raise ValueError(f"Column not found: {column}")
+
+
+# JSON Lines are read line by line, one JSON document per line
+@register_extractor(
+    "text",
+    (".txt", ".log", ".md", ".jsonl", ".ndjson"),
+    ("text/plain", "application/x-ndjson", "application/jsonl"),
+)
+def iter_text_lines(file_path, progress, column=None, sheet=None):
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        progress.track(f.buffer)
+        for line in f:
+            yield line.rstrip("\r\n")
+
+
+@register_extractor("csv", (".csv",), ("text/csv",))
+def iter_csv_text(file_path, progress, column=None, sheet=None):
+    """Rows joined with " | ", or just the cells of one column."""
     try:
         with open(file_path, newline="", encoding="utf-8") as f:
+            progress.track(f.buffer)
             reader = csv.reader(f)
+            if column is None:
+                for row in reader:
+                    yield " | ".join(row)  # Join row content
+                return
+            index = _column_index(next(reader, []), column)
             for row in reader:
-                content.append(" | ".join(row))  # Join row content
-        return content
+                if index < len(row):
+                    yield row[index]
     except Exception as e:
         raise ValueError(f"Error reading CSV file: {e}")
 
 
-def extract_text_from_json(file_path):
-    """Extracts all content from a JSON file."""
-    file_path = validate_path(file_path)
+@register_extractor("json", (".json",), ("application/json",))
+def iter_json_text(file_path, progress, column=None, sheet=None):
+    from jsonstream import leaves
 
-    content = []
+    # For JSON the column is a pointer such as "/contacts/*/email"
     try:
         with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-            def extract_from_json(obj):
-                if isinstance(obj, dict):
-                    for value in obj.values():
-                        extract_from_json(value)
-                elif isinstance(obj, list):
-                    for item in obj:
-                        extract_from_json(item)
-                else:
-                    content.append(str(obj))  # Convert numbers/booleans to string
-
-            extract_from_json(data)
-        return content
+            progress.track(f.buffer)
+            for _, value in leaves(f, column):
+                yield str(value)  # Convert numbers/booleans to string
     except Exception as e:
         raise ValueError(f"Error reading JSON file: {e}")
 
 
-def extract_text_from_excel(file_path):
-    """Extracts all content from an Excel file (.xls, .xlsx)."""
-    file_path = validate_path(file_path)
-
+@register_extractor(
+    "excel",
+    (".xlsx", ".xls"),
+    (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "application/vnd.ms-excel",
+    ),
+)
+def iter_excel_text(file_path, progress, column=None, sheet=None):
     try:
-        content = []
-        df = pd.read_excel(file_path, sheet_name=None)  # Read all sheets
-        for sheet_name, sheet in df.items():
-            for col in sheet.columns:
-                for value in sheet[col]:
-                    content.append(str(value))  # Convert all values to string
-        return content
+        if os.path.splitext(file_path)[1].lower() != ".xls":
+            from spreadsheets import iter_excel_cells
+
+            # Streams rows with openpyxl's read-only reader (or the Parquet cache)
+            with open(file_path, "rb") as f:
+                progress.track(f)
+                yield from iter_excel_cells(f, file_path, sheet=sheet, column=column)
+            return
+
+        import pandas as pd
+
+        sheets = pd.read_excel(file_path, sheet_name=sheet)  # None reads all sheets
+        if not isinstance(sheets, dict):
+            sheets = {sheet: sheets}
+        for sheet_name, frame in sheets.items():
+            columns = frame.columns if column is None else [column]
+            for col in columns:
+                if col not in frame.columns:
+                    continue
+                for value in frame[col]:
+                    yield str(value)  # Convert all values to string
     except Exception as e:
         raise ValueError(f"Error reading Excel file: {e}")
 
 
-def extract_text_from_word(file_path):
-    """Extracts all content from a Word (.docx) file."""
-    file_path = validate_path(file_path)
+@register_extractor(
+    "docx",
+    (".docx",),
+    ("application/vnd.openxmlformats-officedocument.wordprocessingml.document",),
+)
+def iter_word_text(file_path, progress, column=None, sheet=None):
+    from documents import iter_docx_paragraphs, DOCX_FAST_PATH
 
     try:
-        content = []
-        doc = docx.Document(file_path)
+        with open(file_path, "rb") as f:
+            progress.track(f)
+            if DOCX_FAST_PATH:
+                yield from iter_docx_paragraphs(f, include_tables=False)
+                return
+
+            import docx  # type: ignore
+
+            doc = docx.Document(f)
         for para in doc.paragraphs:
-            content.append(para.text.strip())
-        return content
+            yield para.text.strip()
     except Exception as e:
         raise ValueError(f"Error reading Word file: {e}")
+
+
+def _extract_all(name, file_path, **options):
+    file_path = validate_path(file_path)
+    return list(EXTRACTORS[name](file_path, ExtractProgress(file_path), **options))
+
+
+def extract_text_from_csv(file_path):
+    """Extracts all content from a CSV file as a list of strings."""
+    return _extract_all("csv", file_path)
+
+
+def extract_text_from_json(file_path, pointer=None):
+    """
+    Lazily yields every scalar in a JSON file as a string. pointer (e.g.
+    "/contacts/*/email") limits it to one subtree.
+    """
+    file_path = validate_path(file_path)
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    return iter_json_text(file_path, ExtractProgress(file_path), column=pointer)
+
+
+def extract_text_from_excel(file_path):
+    """Extracts all content from an Excel file (.xls, .xlsx)."""
+    return _extract_all("excel", file_path)
+
+
+def extract_text_from_word(file_path):
+    """Extracts all content from a Word (.docx) file."""
+    return _extract_all("docx", file_path)
@@ -0,0 +1,272 @@
+import os
+import json
+import time
+import asyncio
+import base64
+import sqlite3
+import threading
+
+from utils import (
+    CACHE_DIR,
+    LLM_MODEL,
+    llm_process_image,
+    llm_process_image_structured,
+    llm_text_extraction,
+    allm_process_image,
+    allm_process_image_structured,
+    allm_text_extraction,
+)
+from images import file_sha256, prepare_vision_image, VISION_PREENCODE
+
+# "single_call" asks the vision model for the transcription and the
+# extraction in one tool call; "two_step" transcribes first and extracts
+# from the text in a second call.
+VISION_MODE = os.environ.get("VISION_MODE", "single_call")
+OCR_CACHE_ENABLED = os.environ.get("OCR_CACHE_ENABLED", "1") == "1"
+OCR_CACHE_DB = os.path.join(CACHE_DIR, "ocr.sqlite3")
+VISION_BATCH_CONCURRENCY = int(os.environ.get("VISION_BATCH_CONCURRENCY", "8"))
+VISION_BATCH_RETRIES = int(os.environ.get("VISION_BATCH_RETRIES", "3"))
+
+GENERAL_INSTRUCTION = "Extract all readable text and numbers from this image.Provide the extracted content in a structured format."
+
+
+class OcrCache:
+    """Generic OCR text of an image, keyed on its content hash and model."""
+
+    def __init__(self, db_path=OCR_CACHE_DB):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._db_ready = False
+
+    def _connect(self):
+        if not self._db_ready:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        if not self._db_ready:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS ocr (
+                    key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    def key(self, image_hash):
+        return f"{LLM_MODEL}:{image_hash}"
+
+    def get(self, image_hash):
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT text FROM ocr WHERE key = ?", (self.key(image_hash),)
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"OCR cache read failed: {e}")
+            row = None
+
+        with self.lock:
+            # Rows left empty by an older version count as misses
+            if row is None or not row[0]:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def put(self, image_hash, text):
+        # An empty transcription would stop the image from ever being re-read
+        if not text:
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO ocr VALUES (?, ?, ?)",
+                    (self.key(image_hash), text, time.time()),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"OCR cache write failed: {e}")
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+ocr_cache = OcrCache()
+
+
+def encode_image(image_path):
+    """Returns (base64_string, extension, info) for a vision upload."""
+    if VISION_PREENCODE:
+        # Shrinks and re-encodes the upload to what the model can resolve
+        return prepare_vision_image(image_path)
+    with open(image_path, "rb") as image_file:
+        raw = image_file.read()
+    info = {"source_bytes": len(raw), "encoded_bytes": len(raw), "seconds": 0.0}
+    return base64.b64encode(raw).decode("utf-8"), os.path.splitext(image_path)[1][1:], info
+
+
+def log_vision_call(info, start):
+    print(
+        f"process_image: {info['source_bytes']} -> {info['encoded_bytes']} bytes "
+        f"({1 - info['encoded_bytes'] / max(1, info['source_bytes']):.0%} saved), "
+        f"encode {info['seconds']:.2f}s, vision call {time.perf_counter() - start:.2f}s"
+    )
+
+
+def tool_arguments(llm_response):
+    return json.loads(
+        llm_response["choices"][0]["message"]["tool_calls"][0]["function"]["arguments"]
+    )
+
+
+# Model calls by name, as (sync, async) pairs
+LLM_CALLS = {
+    "text_extraction": (llm_text_extraction, allm_text_extraction),
+    "process_image": (llm_process_image, allm_process_image),
+    "process_image_structured": (llm_process_image_structured, allm_process_image_structured),
+}
+
+
+def _extraction_steps(image_path, processing_instruction, mode):
+    """
+    The extraction as a generator: it yields (call, args) for every model
+    call (a name in LLM_CALLS) or blocking call (a function) and is sent
+    back the result, so the sync and async drivers share the cache, prompt
+    and response handling and differ only in how they perform the calls.
+    """
+    if mode not in ("single_call", "two_step"):
+        raise ValueError(f"Invalid vision mode: {mode}")
+
+    image_hash = None
+    ocr_text = None
+    if OCR_CACHE_ENABLED:
+        image_hash = yield file_sha256, (image_path,)
+        ocr_text = yield ocr_cache.get, (image_hash,)
+    if ocr_text:
+        text_llm_response = yield "text_extraction", (processing_instruction, ocr_text)
+        return tool_arguments(text_llm_response)["extracted_information"]
+
+    encoded_string, image_extension, info = yield encode_image, (image_path,)
+    start = time.perf_counter()
+    if mode == "single_call":
+        arguments = tool_arguments(
+            (
+                yield "process_image_structured",
+                (encoded_string, image_extension, processing_instruction),
+            )
+        )
+        log_vision_call(info, start)
+        if OCR_CACHE_ENABLED:
+            yield ocr_cache.put, (image_hash, arguments.get("ocr_text", ""))
+        return arguments["extracted_information"]
+
+    image_llm_response = yield "process_image", (
+        encoded_string,
+        image_extension,
+        GENERAL_INSTRUCTION,
+    )
+    log_vision_call(info, start)
+    ocr_text = image_llm_response["choices"][0]["message"]["content"]
+    if OCR_CACHE_ENABLED:
+        yield ocr_cache.put, (image_hash, ocr_text)
+    text_llm_response = yield "text_extraction", (processing_instruction, ocr_text)
+    return tool_arguments(text_llm_response)["extracted_information"]
+
+
+def extract_from_image(image_path, processing_instruction, mode=VISION_MODE):
+    """
+    Returns the list of strings extracted from the image. The image's OCR
+    text is cached by content hash, so later instructions on the same image
+    only need a text-only extraction call.
+    """
+    steps = _extraction_steps(image_path, processing_instruction, mode)
+    result = None
+    try:
+        while True:
+            call, args = steps.send(result)
+            result = LLM_CALLS[call][0](*args) if isinstance(call, str) else call(*args)
+    except StopIteration as done:
+        return done.value
+
+
+async def aextract_from_image(image_path, processing_instruction, mode=VISION_MODE):
+    """Async counterpart of extract_from_image on the pooled async client."""
+    steps = _extraction_steps(image_path, processing_instruction, mode)
+    result = None
+    try:
+        while True:
+            call, args = steps.send(result)
+            if isinstance(call, str):
+                result = await LLM_CALLS[call][1](*args)
+            else:
+                # Hashing, SQLite and Pillow work run off the event loop
+                result = await asyncio.to_thread(call, *args)
+    except StopIteration as done:
+        return done.value
+
+
+async def _extract_with_retry(image_path, processing_instruction, semaphore, retries):
+    for attempt in range(retries):
+        try:
+            # Only the request holds a slot; backoff below leaves it to others
+            async with semaphore:
+                extracted = await aextract_from_image(image_path, processing_instruction)
+            return {"image": image_path, "extracted_information": extracted}
+        except Exception as e:
+            if attempt == retries - 1:
+                return {"image": image_path, "error": str(e), "attempts": retries}
+        await asyncio.sleep(2**attempt)
+
+
+async def aextract_from_images(
+    image_paths,
+    processing_instruction,
+    output_file,
+    concurrency=VISION_BATCH_CONCURRENCY,
+    retries=VISION_BATCH_RETRIES,
+):
+    """
+    Runs the same extraction over many images with at most `concurrency`
+    vision calls in flight. Each result is appended to output_file as a
+    JSON line as soon as it finishes. Returns (succeeded, failed).
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [
+        asyncio.ensure_future(
+            _extract_with_retry(image_path, processing_instruction, semaphore, retries)
+        )
+        for image_path in image_paths
+    ]
+    succeeded = 0
+    failed = 0
+    start = time.perf_counter()
+    with open(output_file, "w", encoding="utf-8") as f:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            if "error" in result:
+                failed += 1
+            else:
+                succeeded += 1
+            f.write(json.dumps(result) + "\n")
+            f.flush()
+    print(
+        f"extract_from_images: {succeeded} succeeded, {failed} failed "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return succeeded, failed
@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+# The app modules import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """A fresh working directory with the data/ folder the tools are confined to."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    return tmp_path / "data"
@@ -0,0 +1,67 @@
+import numpy as np
+
+from audio import LinearResampler
+
+
+def resample_in_blocks(source_rate, target_rate, samples, block):
+    resampler = LinearResampler(source_rate, target_rate)
+    return np.concatenate(
+        [resampler.process(samples[start:start + block]) for start in range(0, len(samples), block)]
+    )
+
+
+def test_blocked_resampling_equals_one_pass():
+    samples = np.random.default_rng(0).standard_normal(20000).astype(np.float32)
+    for source_rate, target_rate in ((44100, 16000), (48000, 16000), (8000, 16000), (16000, 16000)):
+        one_pass = LinearResampler(source_rate, target_rate).process(samples)
+        for block in (1, 97, 4096):
+            blocked = resample_in_blocks(source_rate, target_rate, samples, block)
+            assert len(blocked) == len(one_pass)
+            np.testing.assert_allclose(blocked, one_pass, atol=1e-5)
+
+
+def test_downsampling_removes_content_above_new_nyquist():
+    rate = 44100
+    t = np.arange(rate) / rate
+
+    def level(frequency):
+        tone = np.sin(2 * np.pi * frequency * t).astype(np.float32)
+        out = LinearResampler(rate, 16000).process(tone)[2000:]
+        return np.sqrt(2) * out.std()
+
+    assert level(1000) > 0.95
+    # 10 kHz would fold back to 6 kHz without the anti-aliasing filter
+    assert level(10000) < 0.001
+
+
+def write_wav(path, samples, rate):
+    import wave
+
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes((samples * 20000).astype(np.int16).tobytes())
+
+
+def test_cuts_land_in_the_silences(tmp_path):
+    from audio import find_cut_points, frame_energies
+
+    rate = 16000
+    t = np.arange(25 * rate) / rate
+    samples = np.sin(2 * np.pi * 300 * t)
+    for gap in (9.5, 19.7):
+        samples[int((gap - 0.1) * rate):int((gap + 0.1) * rate)] = 0
+    path = tmp_path / "speech.wav"
+    write_wav(path, samples, rate)
+
+    energies = frame_energies(str(path))
+    # Energies are the same however many frames each read covers
+    np.testing.assert_allclose(frame_energies(str(path), block_seconds=0.5), energies)
+
+    cuts = find_cut_points(energies, rate, len(samples), segment_seconds=10, search_seconds=2)
+    assert len(cuts) == 4
+    assert cuts[0] == 0 and cuts[-1] == len(samples)
+    assert cuts == sorted(cuts)
+    for cut, gap in zip(cuts[1:-1], (9.5, 19.7)):
+        assert abs(cut / rate - gap) < 0.1
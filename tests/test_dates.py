@@ -0,0 +1,21 @@
+from dates import count_matching, parse_dates, read_date_column
+
+
+def test_headerless_csv_keeps_first_row(tmp_path):
+    path = tmp_path / "dates.csv"
+    path.write_text("2024-01-03\n2024-01-10\n2024-01-17\n2024-01-18\n")
+
+    values = read_date_column(str(path))
+
+    assert values == ["2024-01-03", "2024-01-10", "2024-01-17", "2024-01-18"]
+    assert count_matching(parse_dates(values), "weekday", "Wednesday") == 3
+
+
+def test_ragged_csv_rows_do_not_fail(tmp_path):
+    path = tmp_path / "events.csv"
+    path.write_text("id,when,note\n1,2024-01-03,a\n2,2024-01-10\n3,2024-01-17,b,extra\n4,2024-01-24,c\n")
+
+    values = read_date_column(str(path))
+
+    assert "2024-01-03" in values and "2024-01-24" in values
+    assert "when" not in values
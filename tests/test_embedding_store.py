@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+
+from embedding_store import EmbeddingStore
+
+
+def vectors_for(texts, dim=4):
+    return np.array([[len(text) + offset for offset in range(dim)] for text in texts], dtype=np.float32)
+
+
+def assert_maps(store, texts):
+    found, missing = store.lookup(texts)
+    assert missing == []
+    for vector, expected in zip(found, vectors_for(texts)):
+        np.testing.assert_array_equal(vector, expected)
+
+
+def test_rows_map_after_reopen(tmp_path):
+    first = ["a", "bb", "ccc"]
+    store = EmbeddingStore("test/model", root=str(tmp_path))
+    store.add(first, vectors_for(first))
+
+    reopened = EmbeddingStore("test/model", root=str(tmp_path))
+    assert_maps(reopened, first)
+
+    second = ["dddd", "a", "eeeee"]
+    reopened.add(second, vectors_for(second))
+    assert_maps(EmbeddingStore("test/model", root=str(tmp_path)), first + second)
+
+
+def test_partial_row_is_dropped_on_reopen(tmp_path):
+    store = EmbeddingStore("model", root=str(tmp_path))
+    store.add(["a", "bb"], vectors_for(["a", "bb"]))
+    with open(store.vectors_path, "ab") as f:
+        f.write(b"\0" * 6)
+
+    reopened = EmbeddingStore("model", root=str(tmp_path))
+    assert os.path.getsize(reopened.vectors_path) == 2 * 4 * 4
+    reopened.add(["ccc"], vectors_for(["ccc"]))
+    assert_maps(EmbeddingStore("model", root=str(tmp_path)), ["a", "bb", "ccc"])
+
+
+def test_stores_see_each_others_rows(tmp_path):
+    one = EmbeddingStore("model", root=str(tmp_path))
+    other = EmbeddingStore("model", root=str(tmp_path))
+    one.add(["a"], vectors_for(["a"]))
+    other.add(["bb"], vectors_for(["bb"]))
+    assert_maps(one, ["a", "bb"])
+    assert_maps(other, ["a", "bb"])
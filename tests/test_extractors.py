@@ -0,0 +1,29 @@
+import os
+
+from utils import extract_text, sniff_extractor
+
+
+def lines(path):
+    return [line for chunk in extract_text(os.path.relpath(path)) for line in chunk]
+
+
+def test_json_lines_are_read_as_text(data_dir):
+    for name in ("events.jsonl", "events.ndjson", "events"):
+        path = data_dir / name
+        path.write_text('{"date": "2024-01-03"}\n{"date": "2024-01-10"}\n')
+        assert sniff_extractor(str(path)) == "text"
+        assert lines(path) == ['{"date": "2024-01-03"}', '{"date": "2024-01-10"}']
+
+
+def test_bracketed_log_is_read_as_text(data_dir):
+    path = data_dir / "app"
+    path.write_text("[2024-01-03] started\n[2024-01-10] stopped\n")
+    assert sniff_extractor(str(path)) == "text"
+    assert lines(path) == ["[2024-01-03] started", "[2024-01-10] stopped"]
+
+
+def test_json_without_extension_is_still_sniffed(data_dir):
+    path = data_dir / "document"
+    path.write_text('{"events": [{"date": "2024-01-03"}, {"date": "2024-01-10"}]}')
+    assert sniff_extractor(str(path)) == "json"
+    assert lines(path) == ["2024-01-03", "2024-01-10"]
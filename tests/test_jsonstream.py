@@ -0,0 +1,57 @@
+import io
+import json
+
+from jsonstream import events, items, leaves
+
+DOCUMENT = {
+    "contacts": [
+        {"name": "Zoë \"Z\" O'Neil", "email": "zoe@example.com", "score": -1.5e-3},
+        {"name": "back\\slash\ttab", "email": None, "tags": ["😀", "", "a,b]"]},
+        {"name": "日本", "active": True, "visits": 12345678901234567890},
+    ],
+    "count": 3,
+}
+
+
+def flatten(value, path=()):
+    if isinstance(value, dict):
+        for key, child in value.items():
+            yield from flatten(child, path + (key,))
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            yield from flatten(child, path + (index,))
+    else:
+        yield path, value
+
+
+def test_values_survive_every_chunk_boundary():
+    text = json.dumps(DOCUMENT)
+    expected = list(flatten(DOCUMENT))
+    # Small reads split strings, escapes and numbers at every position
+    for read_bytes in range(1, 40):
+        values = [
+            (path, value)
+            for path, event, value in events(io.StringIO(text), read_bytes=read_bytes)
+            if event == "value"
+        ]
+        assert values == expected, read_bytes
+
+
+def test_pointer_selects_leaves_and_items():
+    text = json.dumps(DOCUMENT)
+    assert [value for _, value in leaves(io.StringIO(text), "/contacts/*/email")] == [
+        "zoe@example.com",
+        None,
+    ]
+    assert list(items(io.StringIO(text), "/contacts/*")) == DOCUMENT["contacts"]
+
+
+def test_deep_nesting_does_not_recurse():
+    depth = 5000  # well past the recursion limit
+    text = "[" * depth + '"deep"' + "]" * depth
+    found = list(leaves(io.StringIO(text)))
+    assert found == [((0,) * depth, "deep")]
+    nested = next(items(io.StringIO(text), "/0/0/0"))
+    for _ in range(depth - 4):
+        nested = nested[0]
+    assert nested == ["deep"]
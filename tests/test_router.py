@@ -0,0 +1,67 @@
+from router import router, ROUTES
+
+
+def test_count_words_is_not_a_date_task():
+    task = "Count the words in /data/essay.txt (you may ignore punctuation) and write the number to /data/words.txt"
+    assert router.route(task) is None
+
+
+def test_weekday_without_date_cue_is_not_routed():
+    task = (
+        "Count how many emails in /data/emails.txt were sent on a Monday morning "
+        "and write the number to /data/monday.txt"
+    )
+    assert router.route(task) is None
+
+
+def test_count_weekdays_is_routed():
+    task = (
+        "The file /data/dates.txt contains a list of dates, one per line. "
+        "Count the number of Wednesdays and write just the number to /data/dates-wednesdays.txt"
+    )
+    assert router.route(task) == (
+        "count_dates",
+        {
+            "input_file": "data/dates.txt",
+            "output_file": "data/dates-wednesdays.txt",
+            "date_part": "weekday",
+            "value_to_count": "Wednesday",
+        },
+    )
+
+
+def test_lowercase_may_next_to_a_year_is_a_month():
+    task = "Count the dates in /data/dates.txt that fall in may 2024 and save it to /data/may.txt"
+    name, arguments = router.route(task)
+    assert name == "count_dates"
+    assert arguments["value_to_count"] == "May"
+
+
+def test_one_keyword_reaches_the_threshold():
+    route = next(route for route in ROUTES if route.function_name == "count_dates")
+    # Only "dates" (in the path) of the route's keywords appears
+    _, confidence = route.score("Count the Sundays in /data/dates.txt into /data/sundays.txt")
+    assert confidence == 0.8
+    assert confidence >= router.threshold
+
+
+def test_no_keyword_falls_through():
+    route = next(route for route in ROUTES if route.function_name == "count_dates")
+    task = "Count the Sundays in /data/list.txt into /data/sundays.txt"
+    _, confidence = route.score(task)
+    assert confidence < router.threshold
+    assert router.route(task) is None
+
+
+def test_date_comparisons_are_not_exact_counts():
+    tasks = [
+        "Count the number of lines in /data/log.txt that mention dates before 2024-01-01 and write it to /data/old.txt",
+        "Count the dates in /data/dates.txt that are 2024-01-01 or later and write the number to /data/new.txt",
+        "Count the dates after 2024-01-01 in /data/dates.txt and write the number to /data/new.txt",
+        "Count the dates since 2023-06-01 in /data/dates.txt and write the number to /data/new.txt",
+        "Count the dates until 2023-06-01 in /data/dates.txt and write the number to /data/old.txt",
+        "How many dates in /data/dates.txt fall between 2023-01-01 and 2023-12-31? Write it to /data/year.txt",
+        "Count the dates from March to May in /data/dates.txt and write the number to /data/spring.txt",
+    ]
+    for task in tasks:
+        assert router.route(task) is None, task
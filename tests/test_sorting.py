@@ -0,0 +1,62 @@
+import json
+import random
+
+from sorting import SortCriteria, sort_json_array
+
+
+def make_contacts(count):
+    rng = random.Random(7)
+    return [
+        {
+            "last_name": rng.choice(["Ng", "Smith", "Garcia", "Lee", "Ölz"]),
+            "age": rng.randrange(20, 30),
+            "id": index,
+        }
+        for index in range(count)
+    ]
+
+
+def expected_order(contacts):
+    # Stable passes from the last field to the first
+    ordered = sorted(contacts, key=lambda contact: contact["age"], reverse=True)
+    return sorted(ordered, key=lambda contact: contact["last_name"])
+
+
+def test_external_merge_matches_sorted(tmp_path):
+    contacts = make_contacts(2000)
+    input_file = tmp_path / "contacts.json"
+    output_file = tmp_path / "sorted.json"
+    input_file.write_text(json.dumps(contacts))
+
+    criteria = SortCriteria(["last_name", "age"], ["asc", "desc"])
+    # A budget this small spills a run every few dozen contacts
+    runs = sort_json_array(str(input_file), str(output_file), criteria, memory_budget=4096)
+
+    assert runs > 1
+    assert json.loads(output_file.read_text()) == expected_order(contacts)
+
+
+def test_in_memory_sort_matches_external(tmp_path):
+    contacts = make_contacts(500)
+    input_file = tmp_path / "contacts.json"
+    input_file.write_text(json.dumps(contacts))
+    criteria = SortCriteria(["last_name", "age"], ["asc", "desc"])
+
+    in_memory = tmp_path / "in-memory.json"
+    external = tmp_path / "external.json"
+    assert sort_json_array(str(input_file), str(in_memory), criteria) == 0
+    sort_json_array(str(input_file), str(external), criteria, memory_budget=2048)
+
+    assert in_memory.read_text() == external.read_text()
+
+
+def test_nulls_stay_last_in_both_directions(tmp_path):
+    contacts = [{"name": "b"}, {"name": None}, {"name": "a"}, {}, {"name": "c"}]
+    input_file = tmp_path / "contacts.json"
+    output_file = tmp_path / "sorted.json"
+    input_file.write_text(json.dumps(contacts))
+
+    for direction, names in (("asc", ["a", "b", "c"]), ("desc", ["c", "b", "a"])):
+        sort_json_array(str(input_file), str(output_file), SortCriteria(["name"], [direction]), memory_budget=64)
+        result = json.loads(output_file.read_text())
+        assert [contact.get("name") for contact in result] == names + [None, None]